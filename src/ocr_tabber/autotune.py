@@ -0,0 +1,311 @@
+# Sweeps tesseract settings over a directory of tab images with ground-truth ASCII
+# Measures character error rate and wall time per configuration and saves the
+# Pareto-optimal settings as a named config file that ocr_tab_image can select
+
+import itertools
+import sys
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+from ocr_tabber.ocr_tab import (
+    SUPPORTED_IMAGE_EXTENSIONS,
+    TAB_CHAR_WHITELIST,
+    TESSDATA_CONFIGS_DIR,
+    TESSDATA_DIR,
+    run_tesseract,
+)
+
+# Type aliases for the labeled corpus
+LabeledPage = tuple[Path, str]  # (image_path, ground_truth_text)
+OcrRunner = Callable[[Image.Image, str], str]  # (image, tesseract_config) -> text
+
+DEFAULT_PROFILE_NAME = "tabs"
+
+# Parameter grid swept by default
+# PSM 4: single column, 6: single block, 11: sparse text
+# OEM 0: legacy engine, 1: LSTM, 3: whatever the traineddata supports
+DEFAULT_PSM_VALUES: tuple[int, ...] = (4, 6, 11)
+DEFAULT_OEM_VALUES: tuple[int, ...] = (0, 1, 3)
+DEFAULT_DAWG_VALUES: tuple[bool, ...] = (True, False)
+
+
+@dataclass(frozen=True)
+class OcrParams:
+    """One point in the tesseract parameter grid."""
+
+    psm: int = 6
+    oem: int = 3
+    load_system_dawg: bool = True
+    load_freq_dawg: bool = True
+
+    def to_config(self) -> str:
+        """Return the settings as a tesseract command-line configuration string."""
+        return (
+            f"--tessdata-dir {TESSDATA_DIR} "
+            f"--psm {self.psm} "
+            f"--oem {self.oem} "
+            f"-c tessedit_char_whitelist={TAB_CHAR_WHITELIST} "
+            f"-c load_system_dawg={int(self.load_system_dawg)} "
+            f"-c load_freq_dawg={int(self.load_freq_dawg)}"
+        )
+
+    def to_config_file(self) -> str:
+        """Return the settings in tesseract config file format."""
+        return (
+            f"tessedit_pageseg_mode {self.psm}\n"
+            f"tessedit_ocr_engine_mode {self.oem}\n"
+            f"tessedit_char_whitelist {TAB_CHAR_WHITELIST}\n"
+            f"load_system_dawg {'T' if self.load_system_dawg else 'F'}\n"
+            f"load_freq_dawg {'T' if self.load_freq_dawg else 'F'}\n"
+        )
+
+
+@dataclass(frozen=True)
+class TuningResult:
+    """Accuracy and speed of one configuration over the corpus."""
+
+    params: OcrParams
+    cer: float  # Mean character error rate over all pages
+    seconds: float  # Total OCR wall time over all pages
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Compute the character error rate of an OCR result against its ground truth.
+
+    Trailing whitespace on each line is ignored, since tesseract does not
+    reproduce it reliably and it carries no tab information.
+
+    Args:
+        reference: The ground-truth text.
+        hypothesis: The OCR output.
+
+    Returns:
+        Levenshtein distance divided by the reference length (may exceed 1.0).
+    """
+    ref = "\n".join(line.rstrip() for line in reference.strip().splitlines())
+    hyp = "\n".join(line.rstrip() for line in hypothesis.strip().splitlines())
+
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_char in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_char in enumerate(hyp, start=1):
+            current.append(min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ref_char != hyp_char),  # substitution
+            ))
+        previous = current
+
+    return previous[-1] / len(ref)
+
+
+def collect_labeled_corpus(corpus_dir: Path) -> list[LabeledPage]:
+    """
+    Find tab images with ground truth in a directory tree.
+
+    Each image is paired with a ``.txt`` file of the same name next to it.
+    Images without ground truth are skipped.
+
+    Args:
+        corpus_dir: Directory to search recursively.
+
+    Returns:
+        List of (image_path, ground_truth_text) pairs, sorted by path.
+
+    Raises:
+        FileNotFoundError: If the directory doesn't exist.
+        ValueError: If no labeled images are found.
+    """
+    if not corpus_dir.is_dir():
+        raise FileNotFoundError(f"Corpus directory not found: {corpus_dir}")
+
+    corpus = []
+    for img_path in sorted(corpus_dir.rglob("*")):
+        if img_path.suffix.lower() not in SUPPORTED_IMAGE_EXTENSIONS:
+            continue
+        truth_path = img_path.with_suffix(".txt")
+        if truth_path.exists():
+            corpus.append((img_path, truth_path.read_text()))
+
+    if not corpus:
+        raise ValueError(f"No labeled images found in corpus directory: {corpus_dir}")
+
+    return corpus
+
+
+def build_param_grid(
+    psm_values: Iterable[int] = DEFAULT_PSM_VALUES,
+    oem_values: Iterable[int] = DEFAULT_OEM_VALUES,
+    dawg_values: Iterable[bool] = DEFAULT_DAWG_VALUES,
+) -> list[OcrParams]:
+    """
+    Build the list of parameter combinations to evaluate.
+
+    The system and frequent-word dictionaries are toggled independently.
+    """
+    dawg_values = tuple(dawg_values)
+    return [
+        OcrParams(psm, oem, system_dawg, freq_dawg)
+        for psm, oem, system_dawg, freq_dawg in itertools.product(
+            psm_values, oem_values, dawg_values, dawg_values
+        )
+    ]
+
+
+def evaluate_params(
+    params: OcrParams,
+    corpus: Sequence[LabeledPage],
+    runner: OcrRunner = run_tesseract,
+) -> TuningResult:
+    """
+    Run one configuration over the whole corpus.
+
+    Args:
+        params: Tesseract settings to evaluate.
+        corpus: Labeled pages from collect_labeled_corpus.
+        runner: Function running OCR on an image with a config string.
+
+    Returns:
+        TuningResult with the mean CER and total OCR time.
+
+    Raises:
+        IOError: If an image cannot be read.
+        RuntimeError: If OCR fails for this configuration.
+    """
+    config = params.to_config()
+    total_cer = 0.0
+    total_seconds = 0.0
+
+    for img_path, truth in corpus:
+        try:
+            with Image.open(img_path) as image:
+                image.load()
+                start = time.perf_counter()
+                text = runner(image, config)
+                total_seconds += time.perf_counter() - start
+        except OSError as e:
+            raise OSError(f"Failed to open image file: {img_path}") from e
+        total_cer += character_error_rate(truth, text)
+
+    return TuningResult(params, total_cer / len(corpus), total_seconds)
+
+
+def pareto_front(results: Iterable[TuningResult]) -> list[TuningResult]:
+    """
+    Return the results not dominated on both error rate and time.
+
+    A result is dominated if another one is at least as accurate and at least
+    as fast, and strictly better on one of the two.
+
+    Returns:
+        The Pareto-optimal results, most accurate first.
+    """
+    front = []
+    best_seconds = float("inf")
+    for result in sorted(results, key=lambda r: (r.cer, r.seconds)):
+        if result.seconds < best_seconds:
+            front.append(result)
+            best_seconds = result.seconds
+    return front
+
+
+def select_profile(front: Sequence[TuningResult], max_cer: float | None = None) -> TuningResult:
+    """
+    Pick one configuration from the Pareto front.
+
+    Args:
+        front: Pareto-optimal results, most accurate first.
+        max_cer: If given, the fastest result with a CER at or below this
+            value is chosen. Otherwise the most accurate one is.
+
+    Returns:
+        The selected result.
+
+    Raises:
+        ValueError: If the front is empty or no result meets max_cer.
+    """
+    if not front:
+        raise ValueError("No successful OCR configurations to choose from")
+
+    if max_cer is None:
+        return front[0]
+
+    eligible = [r for r in front if r.cer <= max_cer]
+    if not eligible:
+        raise ValueError(
+            f"No configuration reached a character error rate of {max_cer:.3f} "
+            f"(best was {front[0].cer:.3f})"
+        )
+    return min(eligible, key=lambda r: r.seconds)
+
+
+def write_profile(
+    result: TuningResult,
+    name: str = DEFAULT_PROFILE_NAME,
+    configs_dir: Path = TESSDATA_CONFIGS_DIR,
+) -> Path:
+    """
+    Write a tuned configuration as a named tesseract config file.
+
+    Args:
+        result: The configuration to save.
+        name: File name of the profile, later passed to ocr_tab_image.
+        configs_dir: Directory holding tesseract config files.
+
+    Returns:
+        Path of the written config file.
+
+    Raises:
+        ValueError: If the name is not a plain file name.
+        IOError: If the file cannot be written.
+    """
+    if not name or Path(name).name != name:
+        raise ValueError(f"Invalid OCR profile name: {name!r}")
+
+    output_path = configs_dir / name
+    content = (
+        "# Generated by ocr-tabber autotune\n"
+        f"# cer={result.cer:.4f} seconds={result.seconds:.3f}\n"
+        + result.params.to_config_file()
+    )
+
+    try:
+        output_path.write_text(content)
+    except Exception as e:
+        raise OSError(f"Failed to write OCR profile: {output_path}") from e
+
+    return output_path
+
+
+def autotune(
+    corpus: Sequence[LabeledPage],
+    grid: Iterable[OcrParams],
+    runner: OcrRunner = run_tesseract,
+) -> list[TuningResult]:
+    """
+    Evaluate every configuration in the grid over the corpus.
+
+    Configurations that tesseract rejects (e.g. an engine mode the installed
+    traineddata doesn't support) are reported on stderr and left out.
+
+    Returns:
+        Results for every configuration that ran successfully, in grid order.
+
+    Raises:
+        IOError: If an image cannot be read.
+    """
+    results = []
+    for params in grid:
+        try:
+            results.append(evaluate_params(params, corpus, runner))
+        except RuntimeError as e:
+            print(f"Skipping {params}: {e}", file=sys.stderr)
+    return results
@@ -0,0 +1,214 @@
+# Indexed SQLite chord catalogue built from the XML chord database
+# Keeps type, root, shape, aliases, priorities and fingerings, and answers
+# lookups by root/type, alias, fingering or name through indexes
+
+import sqlite3
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+from ocr_tabber.tab_db_extractor import ChordRecord
+
+# Get the data directory path relative to this module
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+CATALOGUE_PATH = DATA_DIR / "mainDB.sqlite"
+
+# Voicings without a priority sort after every ranked voicing
+UNRANKED = 1_000_000
+
+SCHEMA = """
+CREATE TABLE chords (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL COLLATE NOCASE,
+    root TEXT NOT NULL,
+    shape TEXT NOT NULL COLLATE NOCASE
+);
+CREATE TABLE aliases (
+    alias TEXT NOT NULL,
+    chord_id INTEGER NOT NULL REFERENCES chords(id)
+);
+CREATE TABLE voicings (
+    id INTEGER PRIMARY KEY,
+    chord_id INTEGER NOT NULL REFERENCES chords(id),
+    priority INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    notation TEXT NOT NULL,
+    frets TEXT NOT NULL,
+    fingers TEXT NOT NULL,
+    info TEXT NOT NULL
+);
+CREATE INDEX idx_chords_root_type ON chords(root, type);
+CREATE INDEX idx_chords_type ON chords(type);
+CREATE INDEX idx_chords_name ON chords(name);
+CREATE INDEX idx_aliases_alias ON aliases(alias);
+CREATE INDEX idx_voicings_notation ON voicings(notation);
+CREATE INDEX idx_voicings_chord_rank ON voicings(chord_id, rank);
+"""
+
+_SELECT_VOICINGS = """
+SELECT c.name, c.type, c.root, c.shape, v.priority, v.notation, v.frets, v.fingers, v.info
+FROM chords c JOIN voicings v ON v.chord_id = c.id
+"""
+_ORDER_BY_RANK = " ORDER BY v.rank, c.id, v.id"
+
+
+@dataclass(frozen=True)
+class CatalogueVoicing:
+    """A voicing returned by a catalogue query."""
+
+    name: str
+    chord_type: str
+    root: str
+    shape: str
+    priority: int
+    notation: str  # Same format as the pickle database, e.g. 'A 0 D 2 G 2 B 2 E 0 '
+    frets: str  # Comma separated, thickest string first, 'x' for unplayed strings
+    fingers: str  # Comma separated, '-' where no finger is given
+    info: str
+
+
+def normalize_notation(notation: str) -> str:
+    """Bring fret notation typed by a user to the stored 'A 0 D 2 ' form."""
+    return ''.join(f"{token} " for token in notation.split())
+
+
+def _join(values: Sequence[int | None], missing: str) -> str:
+    """Join optional ints with commas, using a placeholder for None."""
+    return ','.join(missing if value is None else str(value) for value in values)
+
+
+def build_catalogue(records: Sequence[ChordRecord], output_path: Path = CATALOGUE_PATH) -> None:
+    """
+    Write chord records to a new SQLite catalogue, replacing any existing file.
+
+    Args:
+        records: Chords parsed with parse_xml_catalogue.
+        output_path: Path of the SQLite file to create.
+
+    Raises:
+        IOError: If the catalogue cannot be written.
+    """
+    try:
+        output_path.unlink(missing_ok=True)
+        connection = sqlite3.connect(output_path)
+    except Exception as e:
+        raise OSError(f"Failed to write chord catalogue: {output_path}") from e
+
+    try:
+        with connection:
+            connection.executescript(SCHEMA)
+            for record in records:
+                chord_id = connection.execute(
+                    "INSERT INTO chords (name, type, root, shape) VALUES (?, ?, ?, ?)",
+                    (record.name, record.chord_type, record.root, record.shape),
+                ).lastrowid
+                connection.executemany(
+                    "INSERT INTO aliases (alias, chord_id) VALUES (?, ?)",
+                    [(alias, chord_id) for alias in record.aliases],
+                )
+                connection.executemany(
+                    "INSERT INTO voicings (chord_id, priority, rank, notation, frets, fingers, info)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            chord_id,
+                            voicing.priority,
+                            voicing.priority or UNRANKED,
+                            voicing.notation,
+                            _join(voicing.frets, 'x'),
+                            _join(voicing.fingers, '-'),
+                            voicing.info,
+                        )
+                        for voicing in record.voicings
+                    ],
+                )
+            connection.execute("ANALYZE")
+    except sqlite3.Error as e:
+        raise OSError(f"Failed to write chord catalogue: {output_path}") from e
+    finally:
+        connection.close()
+
+
+class ChordCatalogue:
+    """
+    Read-only query interface to a SQLite chord catalogue.
+
+    Every lookup returns voicings ranked by priority (unranked last), and is
+    served by an index on the column it filters on.
+    """
+
+    def __init__(self, db_path: Path = CATALOGUE_PATH):
+        """
+        Open the catalogue.
+
+        Raises:
+            FileNotFoundError: If the catalogue file doesn't exist.
+            IOError: If the file is not a chord catalogue.
+        """
+        if not db_path.exists():
+            raise FileNotFoundError(
+                f"Chord catalogue not found: {db_path} (build it with 'ocr-tabber build-db --sqlite')"
+            )
+
+        try:
+            self.connection = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+            self.connection.execute("SELECT 1 FROM chords, aliases, voicings LIMIT 1")
+        except sqlite3.Error as e:
+            raise OSError(f"Failed to read chord catalogue: {db_path}") from e
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _query(self, where: str, params: Sequence[str]) -> list[CatalogueVoicing]:
+        """Run a voicing query with the given WHERE clause."""
+        rows = self.connection.execute(_SELECT_VOICINGS + where + _ORDER_BY_RANK, params)
+        return [CatalogueVoicing(*row) for row in rows]
+
+    def lookup(
+        self,
+        root: str | None = None,
+        chord_type: str | None = None,
+        shape: str | None = None,
+    ) -> list[CatalogueVoicing]:
+        """
+        Find voicings by root note, chord type and/or shape.
+
+        The chord type and shape are matched case-insensitively.
+
+        Raises:
+            ValueError: If no criteria are given.
+        """
+        if root is None and chord_type is None:
+            raise ValueError("At least a root or a chord type is required")
+
+        clauses = []
+        params = []
+        for column, value in (("c.root", root), ("c.type", chord_type), ("c.shape", shape)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        return self._query("WHERE " + " AND ".join(clauses), params)
+
+    def lookup_alias(self, alias: str) -> list[CatalogueVoicing]:
+        """Find voicings of the chords written as the given alias (e.g. 'Am')."""
+        return self._query(
+            "WHERE c.id IN (SELECT chord_id FROM aliases WHERE alias = ?)", [alias]
+        )
+
+    def lookup_fingering(self, notation: str) -> list[CatalogueVoicing]:
+        """Find voicings with the given fret notation (e.g. 'A 0 D 2 G 2 B 2 E 0')."""
+        return self._query("WHERE v.notation = ?", [normalize_notation(notation)])
+
+    def voicings(self, name: str) -> list[CatalogueVoicing]:
+        """Return every voicing of the chords with the given name."""
+        return self._query("WHERE c.name = ?", [name])
@@ -2,15 +2,20 @@
 # Checks for and recognizes chords in input ASCII tabs from a pre-existing database.
 
 import pickle
+import re
 import sys
-from operator import itemgetter
+from array import array
 from pathlib import Path
+from typing import Self
+
+from ocr_tabber.note_table import MAX_FRET, TECHNIQUE_MARKS, NoteTable
 
 # Type aliases for chord database and tab notation
 ChordEntry = list[str]  # [chord_name, fret_notation_string]
 ChordDatabase = list[ChordEntry]
 NotePosition = list[int]  # [string_num, fret_num, position]
 StringTuning = list[str]  # List of uppercase note letters (e.g., ['E', 'A', 'D', 'G', 'B', 'E'])
+ChordMatch = tuple[str, list[str]]  # (chord_name, fret notation of every fingering with that name)
 
 # Get the data directory path relative to this module
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
@@ -20,6 +25,9 @@ CHORD_DB_PATH = DATA_DIR / "mainDB.pkl"
 # List of allowed tunings for strings
 ALLOWED_KEY: list[str] = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'A', 'B', 'C', 'D', 'E', 'F', 'G']
 
+# Notes joined by technique marks within one token, e.g. '5h7', '7p5', '3/5' or '5h7p5'
+TECHNIQUE_TOKEN = re.compile(r"\d+(?:[hp/]\d+)+")
+
 
 def load_chord_database(db_path: Path = CHORD_DB_PATH) -> ChordDatabase:
     """
@@ -47,18 +55,94 @@ def load_chord_database(db_path: Path = CHORD_DB_PATH) -> ChordDatabase:
         raise OSError(f"Failed to read chord database: {db_path}") from e
 
 
-def parse_tab_file(tab_path: Path = ASCII_TAB_PATH) -> tuple[StringTuning, list[NotePosition]]:
+def parse_tab_table(text: str, source: str = "tab text") -> tuple[StringTuning, NoteTable]:
     """
-    Parse an ASCII tab file and extract notes and key information.
+    Parse ASCII tab text into a NoteTable sorted by column.
+
+    A note preceded by a technique mark ('h', 'p' or '/', e.g. '5h7' or
+    '5h-7') gets the matching technique flag. Notes joined by marks within
+    one token share the token's column; NoteTable.chord_groups leaves the
+    later ones out of chords, since they are played after the first. Frets too large for the table are
+    stored as MAX_FRET.
 
     Args:
-        tab_path: Path to the ASCII tab file.
+        text: The ASCII tab, e.g. the output of ocr_tab_image.
+        source: Description of where the text came from, used in error messages.
+
+    Returns:
+        Tuple of (key, notes) where:
+            - key: StringTuning - List of string tunings (uppercase letters)
+            - notes: NoteTable of every note, sorted by position
+
+    Raises:
+        ValueError: If the text has no tab lines or more than 6 strings.
+    """
+    key = []
+    strings = array('b')
+    frets = array('h')
+    columns = array('i')
+    flags = array('B')
+    string_count = 1
+
+    for line in text.splitlines(keepends=True):
+        if string_count > 6:
+            string_count = 1
+        if line and line[0] in ALLOWED_KEY:
+            key.append(line[0].upper())
+            line_notes = line.replace('|', ' ').replace('\\', ' ').split('-')
+            previous = ''
+            for count, note in enumerate(line_notes, start=1):
+                if note.isdigit():
+                    parts = [note]
+                elif TECHNIQUE_TOKEN.fullmatch(note):
+                    parts = re.split(r"([hp/])", note)
+                else:
+                    parts = []
+                mark = previous[-1:]
+                for i in range(0, len(parts), 2):
+                    strings.append(string_count)
+                    frets.append(min(int(parts[i]), MAX_FRET))
+                    columns.append(count)
+                    flags.append(TECHNIQUE_MARKS.get(parts[i - 1] if i else mark, 0))
+                previous = note.strip()
+            string_count += 1
+
+    if not key:
+        raise ValueError(f"No valid tab lines found in {source}")
+
+    if len(key) > 6:
+        raise ValueError(
+            f"{len(key)} strings found in {source}. "
+            "Only standard 6-string guitar tabs are supported."
+        )
+
+    return key, NoteTable(strings, frets, columns, flags).sorted_by_column()
+
+
+def parse_tab_text(text: str, source: str = "tab text") -> tuple[StringTuning, list[NotePosition]]:
+    """
+    Parse ASCII tab text and extract notes and key information.
+
+    Args:
+        text: The ASCII tab, e.g. the output of ocr_tab_image.
+        source: Description of where the text came from, used in error messages.
 
     Returns:
         Tuple of (key, all_notes) where:
             - key: StringTuning - List of string tunings (uppercase letters)
             - all_notes: List of NotePosition [string_num, fret_num, position] triplets
 
+    Raises:
+        ValueError: If the text has no tab lines or more than 6 strings.
+    """
+    key, notes = parse_tab_table(text, source)
+    return key, notes.to_notes()
+
+
+def read_tab_file(tab_path: Path = ASCII_TAB_PATH) -> str:
+    """
+    Read an ASCII tab file.
+
     Raises:
         FileNotFoundError: If the tab file doesn't exist.
         IOError: If the tab file cannot be read.
@@ -66,101 +150,202 @@ def parse_tab_file(tab_path: Path = ASCII_TAB_PATH) -> tuple[StringTuning, list[
     if not tab_path.exists():
         raise FileNotFoundError(f"Tab file not found: {tab_path}")
 
-    key = []
-    all_notes = []
-    string_count = 1
-
     try:
-        with open(tab_path) as infile:
-            for line in infile:
-                if string_count > 6:
-                    string_count = 1
-                if line and line[0] in ALLOWED_KEY:
-                    line_pos = []
-                    key.append(line[0].upper())
-                    line_notes = line.replace('|', ' ').replace('\\', ' ').split('-')
-                    count = 0
-                    for note in line_notes:
-                        count += 1
-                        if note.isdigit():
-                            line_pos.append(count)
-                    line_notes = [int(x) for x in line_notes if x.isdigit()]
-                    for i in range(len(line_notes)):
-                        all_notes.append([string_count, line_notes[i], line_pos[i]])
-                    string_count += 1
+        return tab_path.read_text()
     except Exception as e:
         raise OSError(f"Failed to read tab file: {tab_path}") from e
 
-    all_notes = sorted(all_notes, key=itemgetter(2))
 
-    if not key:
-        raise ValueError(f"No valid tab lines found in file: {tab_path}")
+def parse_tab_file(tab_path: Path = ASCII_TAB_PATH) -> tuple[StringTuning, list[NotePosition]]:
+    """
+    Parse an ASCII tab file and extract notes and key information.
 
-    if len(key) > 6:
-        raise ValueError(
-            f"Tab file contains more than 6 strings ({len(key)} found). "
-            "Only standard 6-string guitar tabs are supported."
-        )
+    Args:
+        tab_path: Path to the ASCII tab file.
+
+    Returns:
+        Tuple of (key, all_notes) where:
+            - key: StringTuning - List of string tunings (uppercase letters)
+            - all_notes: List of NotePosition [string_num, fret_num, position] triplets
+
+    Raises:
+        FileNotFoundError: If the tab file doesn't exist.
+        IOError: If the tab file cannot be read.
+        ValueError: If the file has no tab lines or more than 6 strings.
+    """
+    return parse_tab_text(read_tab_file(tab_path), f"file: {tab_path}")
+
+
+def chord_notation(key: StringTuning, chord_notes: list[NotePosition]) -> str:
+    """Build the database fret notation of a chord, e.g. 'A 0 D 2 G 2 B 2 E 0 '."""
+    chord = ''
+    i = len(chord_notes) - 1
+    while i >= 0:
+        chord += key[chord_notes[i][0] - 1] + ' ' + str(chord_notes[i][1]) + ' '
+        i -= 1
+    return chord
+
+
+def lookup_chord(notation: str, chord_db: ChordDatabase) -> ChordMatch | None:
+    """Find the chord with the given fret notation and every fingering sharing its name."""
+    chord_set = [x[1] for x in chord_db]
+    if notation not in chord_set:
+        return None
 
-    return key, all_notes
+    index = chord_set.index(notation)
+    chord_name = chord_db[index][0]
+    return chord_name, [entry[1] for entry in chord_db if entry[0] == chord_name]
+
+
+class ChordIndex:
+    """
+    Chord database indexed by fret notation.
+
+    Answers the same lookups as lookup_chord in constant time. The index is
+    never modified after construction, so it can be shared between threads
+    without locking.
+    """
+
+    def __init__(self, chord_db: ChordDatabase):
+        """Index a ChordDatabase loaded from pickle file."""
+        fingerings: dict[str, list[str]] = {}
+        first_name: dict[str, str] = {}
+        for chord_name, notation in chord_db:
+            fingerings.setdefault(chord_name, []).append(notation)
+            first_name.setdefault(notation, chord_name)
+
+        self._matches: dict[str, tuple[str, tuple[str, ...]]] = {
+            notation: (chord_name, tuple(fingerings[chord_name]))
+            for notation, chord_name in first_name.items()
+        }
+
+    @classmethod
+    def load(cls, db_path: Path = CHORD_DB_PATH) -> Self:
+        """
+        Load and index the chord database.
+
+        Raises:
+            FileNotFoundError: If the database file doesn't exist.
+            IOError: If the database cannot be read or unpickled.
+        """
+        return cls(load_chord_database(db_path))
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def lookup(self, notation: str) -> ChordMatch | None:
+        """Find the chord with the given fret notation and every fingering sharing its name."""
+        match = self._matches.get(notation)
+        if match is None:
+            return None
+        chord_name, fingerings = match
+        return chord_name, list(fingerings)
+
+
+def match_chord(key: StringTuning, chord_notes: list[NotePosition], chord_db: ChordDatabase) -> ChordMatch | None:
+    """
+    Run the set of notes for a single chord against the database to find a match.
+
+    Args:
+        key: StringTuning - List of string tunings (uppercase letters).
+        chord_notes: List of NotePosition triplets for the chord.
+        chord_db: ChordDatabase loaded from pickle file.
+
+    Returns:
+        ChordMatch of the chord name and every fingering stored under that
+        name, or None if the notes aren't in the database.
+    """
+    return lookup_chord(chord_notation(key, chord_notes), chord_db)
 
 
 def chord_recognition(key: StringTuning, chord_notes: list[NotePosition], chord_db: ChordDatabase) -> None:
     """
-    Run the set of notes for a single chord against the database to find matches.
+    Run the set of notes for a single chord against the database and print any match.
 
     Args:
         key: StringTuning - List of string tunings (uppercase letters).
         chord_notes: List of NotePosition triplets for the chord.
         chord_db: ChordDatabase loaded from pickle file.
     """
-    chord = ''
-    i = len(chord_notes) - 1
-    while i >= 0:
-        chord += key[chord_notes[i][0] - 1] + ' ' + str(chord_notes[i][1]) + ' '
-        i -= 1
+    match = match_chord(key, chord_notes, chord_db)
+    if match is not None:
+        print(format_chord_match(match))
 
-    chord_set = [x[1] for x in chord_db]
-    if chord in chord_set:
-        index = chord_set.index(chord)
-        chord_name = chord_db[index][0]
-        print("Chord recognized -", chord_name)
-        for i in range(len(chord_db)):
-            if chord_db[i][0] == chord_name:
-                print("Alternate fingering -", chord_db[i][1])
+
+def format_chord_match(match: ChordMatch) -> str:
+    """Format a recognized chord and its alternate fingerings for output."""
+    chord_name, fingerings = match
+    lines = [f"Chord recognized - {chord_name}"]
+    lines.extend(f"Alternate fingering - {fingering}" for fingering in fingerings)
+    return "\n".join(lines)
 
 
-def find_and_recognize_chords(key: StringTuning, all_notes: list[NotePosition], chord_db: ChordDatabase) -> None:
+def group_chord_notes(all_notes: list[NotePosition] | NoteTable) -> list[list[NotePosition]]:
     """
-    Find chords in the note list and recognize them using the database.
+    Find the chords in a sorted note list.
 
     Chords are identified by checking successive notes to see if notes from
     different strings are equidistant from the left (played at the same time).
 
+    Args:
+        all_notes: Sorted list of NotePosition triplets, or a sorted NoteTable.
+
+    Returns:
+        The notes of each chord, in order.
+    """
+    notes = all_notes if isinstance(all_notes, NoteTable) else NoteTable.from_notes(all_notes)
+    return [notes.take(group).to_notes() for group in notes.chord_groups()]
+
+
+def recognize_chords(
+    key: StringTuning,
+    all_notes: list[NotePosition] | NoteTable,
+    chord_db: ChordDatabase | ChordIndex,
+) -> list[ChordMatch]:
+    """
+    Find chords in the note list and recognize them using the database.
+
+    Args:
+        key: StringTuning - List of string tunings (uppercase letters).
+        all_notes: Sorted list of NotePosition triplets, or a sorted NoteTable.
+        chord_db: ChordDatabase loaded from pickle file, or a ChordIndex of it
+            for constant-time lookups.
+
+    Returns:
+        A ChordMatch for every chord found in the database, in playing order.
+    """
+    notes = all_notes if isinstance(all_notes, NoteTable) else NoteTable.from_notes(all_notes)
+    strings = notes.string.tolist()
+    frets = notes.fret.tolist()
+
+    matches = []
+    for group in notes.chord_groups():
+        # Same notation as chord_notation, built straight from the columns
+        notation = ''.join(f"{key[strings[i] - 1]} {frets[i]} " for i in reversed(group.tolist()))
+        if isinstance(chord_db, ChordIndex):
+            match = chord_db.lookup(notation)
+        else:
+            match = lookup_chord(notation, chord_db)
+        if match is not None:
+            matches.append(match)
+    return matches
+
+
+def find_and_recognize_chords(
+    key: StringTuning,
+    all_notes: list[NotePosition] | NoteTable,
+    chord_db: ChordDatabase,
+) -> None:
+    """
+    Find chords in the note list, recognize them using the database and print them.
+
     Args:
         key: StringTuning - List of string tunings (uppercase letters).
-        all_notes: Sorted list of NotePosition triplets.
+        all_notes: Sorted list of NotePosition triplets, or a sorted NoteTable.
         chord_db: ChordDatabase loaded from pickle file.
     """
-    chord_notes = []
-    i = 0
-    while i < len(all_notes) - 1:
-        x = all_notes[i]
-        y = all_notes[i + 1]
-        if x[2] == y[2]:
-            chord_notes.append(x)
-            chord_notes.append(y)
-            i += 1
-            if i < len(all_notes) - 1:
-                y = all_notes[i + 1]
-            while x[2] == y[2] and i < len(all_notes) - 1:
-                chord_notes.append(y)
-                i += 1
-                if i < len(all_notes) - 1:
-                    y = all_notes[i + 1]
-        chord_recognition(key, chord_notes, chord_db)
-        i += 1
-        chord_notes = []
+    for match in recognize_chords(key, all_notes, chord_db):
+        print(format_chord_match(match))
 
 
 def main() -> None:
@@ -172,7 +357,7 @@ def main() -> None:
         sys.exit(1)
 
     try:
-        key, all_notes = parse_tab_file()
+        key, all_notes = parse_tab_table(read_tab_file())
     except (OSError, FileNotFoundError, ValueError) as e:
         print(f"Error loading tab file: {e}", file=sys.stderr)
         sys.exit(1)
@@ -1,27 +1,122 @@
 """Command-line interface for OCR-tabber."""
 
 import argparse
+import functools
 import sys
 from pathlib import Path
 
+from ocr_tabber.autotune import (
+    DEFAULT_OEM_VALUES,
+    DEFAULT_PROFILE_NAME,
+    DEFAULT_PSM_VALUES,
+    autotune,
+    build_param_grid,
+    collect_labeled_corpus,
+    pareto_front,
+    select_profile,
+    write_profile,
+)
+from ocr_tabber.chord_catalogue import (
+    CATALOGUE_PATH,
+    CatalogueVoicing,
+    ChordCatalogue,
+    build_catalogue,
+)
 from ocr_tabber.chord_recognizer import (
     ASCII_TAB_PATH,
-    find_and_recognize_chords,
-    load_chord_database,
-    parse_tab_file,
+    ChordIndex,
+    format_chord_match,
+    read_tab_file,
 )
+from ocr_tabber.deadline import Deadline, OcrTimeoutError, timeout_stats
+from ocr_tabber.ocr_bench import bench_corpus, format_report
 from ocr_tabber.ocr_tab import ocr_tab_image
+from ocr_tabber.page_dedup import (
+    DEFAULT_THRESHOLD,
+    DedupingOcr,
+    PageHashIndex,
+    PageOcr,
+    settings_key,
+)
+from ocr_tabber.session import TabberSession
+from ocr_tabber.synth_corpus import (
+    DEFAULT_DPI,
+    DEGRADATION_LEVELS,
+    TEST_DB_PATH,
+    generate_corpus,
+    load_voicings,
+)
 from ocr_tabber.tab_db_extractor import (
     OUTPUT_DB_PATH,
+    parse_xml_catalogue,
     parse_xml_database,
     save_pickle_database,
 )
+from ocr_tabber.tiled_ocr import (
+    DEFAULT_TILE_HEIGHT,
+    DEFAULT_TILE_OVERLAP,
+    DEFAULT_WORKERS,
+    ocr_tab_image_tiled,
+)
+from ocr_tabber.voice_leading import (
+    VOICING_MATRIX_PATH,
+    VoicingMatrix,
+    build_voicing_matrix,
+    format_suggestions,
+    optimize_voicings,
+)
+from ocr_tabber.watcher import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_WATCH_WORKERS,
+    watch_directory,
+)
+
+
+def with_dedup(args: argparse.Namespace, ocr: PageOcr) -> PageOcr:
+    """
+    Wrap an OCR function with the page hash index given by --dedup-index, if any.
+
+    Pages are only reused between runs with the same --profile and, for
+    --tiled runs, the same tiling.
+
+    Raises:
+        ValueError: If the index was built with different hash settings.
+        IOError: If the index cannot be read.
+    """
+    if not args.dedup_index:
+        return ocr
+
+    if getattr(args, "tiled", False):
+        settings = settings_key(profile=args.profile, tiled=f"{args.tile_height}/{args.tile_overlap}")
+    else:
+        settings = settings_key(profile=args.profile)
+    return DedupingOcr(PageHashIndex(Path(args.dedup_index)), ocr, args.dedup_threshold, settings)
 
 
 def cmd_ocr(args: argparse.Namespace) -> int:
     """Run OCR on a guitar tab image."""
+    if args.tiled:
+        ocr = functools.partial(
+            ocr_tab_image_tiled,
+            profile=args.profile,
+            tile_height=args.tile_height,
+            overlap=args.tile_overlap,
+            workers=args.workers,
+            timeout=args.timeout,
+        )
+    else:
+        ocr = functools.partial(ocr_tab_image, profile=args.profile, timeout=args.timeout)
+
     try:
-        result = ocr_tab_image(args.image)
+        ocr = with_dedup(args, ocr)
+        result = ocr(args.image)
+        if isinstance(ocr, DedupingOcr):
+            ocr.close()
+    except OcrTimeoutError as e:
+        print(f"Timeout: {e}", file=sys.stderr)
+        if e.partial_result:
+            print(e.partial_result)
+        return 2
     except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
@@ -39,6 +134,9 @@ def cmd_ocr(args: argparse.Namespace) -> int:
     else:
         print(result)
 
+    if isinstance(ocr, DedupingOcr):
+        print(ocr.stats.report(), file=sys.stderr)
+
     return 0
 
 
@@ -47,18 +145,31 @@ def cmd_recognize(args: argparse.Namespace) -> int:
     tab_path = Path(args.tab_file) if args.tab_file else ASCII_TAB_PATH
 
     try:
-        chord_db = load_chord_database()
+        session = TabberSession.load()
     except (OSError, FileNotFoundError) as e:
         print(f"Error loading chord database: {e}", file=sys.stderr)
         return 1
 
     try:
-        key, all_notes = parse_tab_file(tab_path)
+        result = session.recognize_text(read_tab_file(tab_path), f"file: {tab_path}")
     except (OSError, FileNotFoundError, ValueError) as e:
         print(f"Error loading tab file: {e}", file=sys.stderr)
         return 1
 
-    find_and_recognize_chords(key, all_notes, chord_db)
+    matches = result.chords
+    for match in matches:
+        print(format_chord_match(match))
+
+    if args.optimize:
+        try:
+            matrix = VoicingMatrix.load()
+        except (OSError, FileNotFoundError, ValueError) as e:
+            print(f"Error loading voicing matrix: {e}", file=sys.stderr)
+            return 1
+
+        chord_names = [name for name, _ in matches]
+        print(format_suggestions(chord_names, optimize_voicings(chord_names, matrix), matrix))
+
     return 0
 
 
@@ -77,9 +188,205 @@ def cmd_build_db(args: argparse.Namespace) -> int:
         return 1
 
     print(f"Successfully extracted {len(chord_list)} chords to {OUTPUT_DB_PATH}")
+
+    # Only recognize --optimize needs the voicing matrix, so a failure doesn't fail the build
+    try:
+        matrix = build_voicing_matrix(parse_xml_catalogue())
+        matrix.save()
+    except (OSError, FileNotFoundError, ValueError) as e:
+        print(f"Warning: voicing matrix not written, recognize --optimize is unavailable: {e}", file=sys.stderr)
+    else:
+        print(f"Precomputed transition costs between {len(matrix)} voicings to {VOICING_MATRIX_PATH}")
+
+    if args.sqlite:
+        catalogue_path = Path(args.sqlite)
+        try:
+            records = parse_xml_catalogue()
+            build_catalogue(records, catalogue_path)
+        except (OSError, FileNotFoundError, ValueError) as e:
+            print(f"Error writing chord catalogue: {e}", file=sys.stderr)
+            return 1
+        print(f"Successfully catalogued {len(records)} chords to {catalogue_path}")
+
+    return 0
+
+
+def format_voicing(voicing: CatalogueVoicing) -> str:
+    """Format a catalogue voicing as one line of output."""
+    priority = voicing.priority or "-"
+    return (
+        f"{voicing.name} [{voicing.chord_type}, {voicing.shape}] "
+        f"priority {priority}: frets {voicing.frets} fingers {voicing.fingers}"
+    )
+
+
+def cmd_chords_lookup(args: argparse.Namespace) -> int:
+    """Look up chords in the SQLite catalogue."""
+    try:
+        with ChordCatalogue(Path(args.catalogue)) as catalogue:
+            if args.alias:
+                results = catalogue.lookup_alias(args.alias)
+            elif args.fingering:
+                results = catalogue.lookup_fingering(args.fingering)
+            elif args.name:
+                results = catalogue.voicings(args.name)
+            else:
+                results = catalogue.lookup(args.root, args.type, args.shape)
+    except (OSError, FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if not results:
+        print("No matching chords found")
+        return 1
+
+    for voicing in results[:args.limit]:
+        print(format_voicing(voicing))
     return 0
 
 
+def cmd_autotune(args: argparse.Namespace) -> int:
+    """Find the best tesseract settings for a labeled corpus of tab images."""
+    try:
+        corpus = collect_labeled_corpus(Path(args.corpus))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    grid = build_param_grid(args.psm, args.oem)
+    print(f"Evaluating {len(grid)} configurations on {len(corpus)} images")
+
+    try:
+        results = autotune(corpus, grid)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    front = pareto_front(results)
+    for result in front:
+        print(f"  cer={result.cer:.4f} time={result.seconds:.2f}s {result.params}")
+
+    try:
+        selected = select_profile(front, args.max_cer)
+        output_path = write_profile(selected, args.name)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Profile '{args.name}' written to {output_path}")
+    return 0
+
+
+def cmd_synth_corpus(args: argparse.Namespace) -> int:
+    """Render a labeled corpus of synthetic tab images."""
+    voicing_pool = None
+    if args.voicings:
+        try:
+            voicing_pool = load_voicings(Path(args.voicings))
+        except (OSError, FileNotFoundError, ValueError) as e:
+            print(f"Error reading XML database: {e}", file=sys.stderr)
+            return 1
+
+    fonts = [Path(font) for font in args.font] if args.font else [None]
+
+    try:
+        written = generate_corpus(
+            Path(args.output_dir),
+            args.pages,
+            levels=args.levels,
+            voicing_pool=voicing_pool,
+            dpi=args.dpi,
+            fonts=fonts,
+            seed=args.seed,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Wrote {len(written)} images to {args.output_dir}")
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    """Measure OCR speed and accuracy over a labeled corpus."""
+    ocr = functools.partial(
+        ocr_tab_image,
+        profile=args.profile,
+        timeout=args.timeout,
+        deadline=Deadline(args.job_timeout),
+    )
+
+    try:
+        stats = bench_corpus(Path(args.corpus), ocr)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(format_report(stats))
+    degraded = timeout_stats()["degraded"]
+    if degraded:
+        print(f"{degraded} pages fell back to the faster OCR settings after a timeout")
+    return 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    """Process tab images dropped into a directory."""
+    try:
+        chord_index = ChordIndex.load()
+    except (OSError, FileNotFoundError) as e:
+        print(f"Error loading chord database: {e}", file=sys.stderr)
+        return 1
+
+    ocr = functools.partial(ocr_tab_image, profile=args.profile, timeout=args.timeout)
+
+    try:
+        ocr = with_dedup(args, ocr)
+        try:
+            stats = watch_directory(
+                Path(args.directory),
+                chord_index,
+                ocr,
+                workers=args.workers,
+                poll_interval=args.poll_interval,
+                use_inotify=not args.polling,
+                once=args.once,
+            )
+        finally:
+            if isinstance(ocr, DedupingOcr):
+                ocr.close()
+    except (OSError, FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+
+    print(
+        f"Processed {stats['processed']}, skipped {stats['skipped']}, "
+        f"timed out {stats['timed_out']}, failed {stats['failed']} images"
+    )
+    if isinstance(ocr, DedupingOcr):
+        print(ocr.stats.report())
+    return 1 if stats["failed"] or stats["timed_out"] else 0
+
+
+def add_dedup_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options for reusing OCR results of near-duplicate pages."""
+    parser.add_argument(
+        "--dedup-index",
+        metavar="PATH",
+        help="Page hash index file; pages close to one already in it reuse its OCR result",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=int,
+        default=DEFAULT_THRESHOLD,
+        help=f"Maximum Hamming distance (of 256 bits) between duplicate pages (default: {DEFAULT_THRESHOLD})",
+    )
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Create the argument parser."""
     parser = argparse.ArgumentParser(
@@ -111,6 +418,40 @@ def create_parser() -> argparse.ArgumentParser:
         "-o", "--output",
         help="Write output to file instead of stdout",
     )
+    ocr_parser.add_argument(
+        "-p", "--profile",
+        help="Name of a tesseract config file in data/tessdata/configs (see autotune)",
+    )
+    ocr_parser.add_argument(
+        "--tiled",
+        action="store_true",
+        help="OCR the image in overlapping bands in parallel (for large, high-DPI scans)",
+    )
+    ocr_parser.add_argument(
+        "--tile-height",
+        type=int,
+        default=DEFAULT_TILE_HEIGHT,
+        help=f"Band height in pixels with --tiled (default: {DEFAULT_TILE_HEIGHT})",
+    )
+    ocr_parser.add_argument(
+        "--tile-overlap",
+        type=int,
+        default=DEFAULT_TILE_OVERLAP,
+        help="Rows shared by neighbouring bands, at least twice the text line height "
+             f"(default: {DEFAULT_TILE_OVERLAP})",
+    )
+    ocr_parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Bands recognized in parallel with --tiled (default: {DEFAULT_WORKERS})",
+    )
+    ocr_parser.add_argument(
+        "-t", "--timeout",
+        type=float,
+        help="Seconds allowed per image before tesseract is killed (the faster fallback settings get the last 30%%)",
+    )
+    add_dedup_arguments(ocr_parser)
     ocr_parser.set_defaults(func=cmd_ocr)
 
     # recognize command
@@ -122,6 +463,11 @@ def create_parser() -> argparse.ArgumentParser:
         "-t", "--tab-file",
         help=f"Path to ASCII tab file (default: {ASCII_TAB_PATH})",
     )
+    recognize_parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Also suggest the easiest sequence of voicings for the recognized chords (needs build-db)",
+    )
     recognize_parser.set_defaults(func=cmd_recognize)
 
     # build-db command
@@ -129,8 +475,217 @@ def create_parser() -> argparse.ArgumentParser:
         "build-db",
         help="Rebuild the chord database from XML source",
     )
+    build_db_parser.add_argument(
+        "--sqlite",
+        nargs="?",
+        const=str(CATALOGUE_PATH),
+        help=f"Also build the indexed SQLite chord catalogue (default: {CATALOGUE_PATH})",
+    )
     build_db_parser.set_defaults(func=cmd_build_db)
 
+    # chords command
+    chords_parser = subparsers.add_parser(
+        "chords",
+        help="Query the SQLite chord catalogue",
+    )
+    chords_subparsers = chords_parser.add_subparsers(
+        title="chords commands",
+        dest="chords_command",
+        required=True,
+    )
+    lookup_parser = chords_subparsers.add_parser(
+        "lookup",
+        help="Find chord voicings, ranked by priority",
+    )
+    lookup_criteria = lookup_parser.add_mutually_exclusive_group()
+    lookup_criteria.add_argument(
+        "--alias",
+        help="Written form of the chord, e.g. Am7",
+    )
+    lookup_criteria.add_argument(
+        "--fingering",
+        help="Fret notation, e.g. 'A 0 D 2 G 2 B 1 E 0'",
+    )
+    lookup_criteria.add_argument(
+        "--name",
+        help="Full chord name, e.g. 'A Minor'",
+    )
+    lookup_parser.add_argument(
+        "--root",
+        help="Root note, e.g. A or Bb",
+    )
+    lookup_parser.add_argument(
+        "--type",
+        help="Chord type, e.g. minor or 'dominant seven'",
+    )
+    lookup_parser.add_argument(
+        "--shape",
+        help="CAGED shape, e.g. 'E Shaped' or Open (with --root/--type)",
+    )
+    lookup_parser.add_argument(
+        "-l", "--limit",
+        type=int,
+        help="Show at most this many voicings",
+    )
+    lookup_parser.add_argument(
+        "--catalogue",
+        default=str(CATALOGUE_PATH),
+        help=f"Path to the chord catalogue (default: {CATALOGUE_PATH})",
+    )
+    lookup_parser.set_defaults(func=cmd_chords_lookup)
+
+    # autotune command
+    autotune_parser = subparsers.add_parser(
+        "autotune",
+        help="Find the best OCR settings for a directory of labeled tab images",
+    )
+    autotune_parser.add_argument(
+        "corpus",
+        help="Directory of tab images, each with a ground-truth .txt file of the same name",
+    )
+    autotune_parser.add_argument(
+        "-n", "--name",
+        default=DEFAULT_PROFILE_NAME,
+        help=f"Name of the profile to write (default: {DEFAULT_PROFILE_NAME})",
+    )
+    autotune_parser.add_argument(
+        "--psm",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_PSM_VALUES),
+        help="Page segmentation modes to try",
+    )
+    autotune_parser.add_argument(
+        "--oem",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_OEM_VALUES),
+        help="OCR engine modes to try",
+    )
+    autotune_parser.add_argument(
+        "--max-cer",
+        type=float,
+        help="Pick the fastest configuration under this character error rate "
+             "instead of the most accurate one",
+    )
+    autotune_parser.set_defaults(func=cmd_autotune)
+
+    # synth-corpus command
+    synth_parser = subparsers.add_parser(
+        "synth-corpus",
+        help="Render synthetic tab images with ground truth for benchmarking",
+    )
+    synth_parser.add_argument(
+        "output_dir",
+        help="Directory to write the corpus to (one subdirectory per degradation level)",
+    )
+    synth_parser.add_argument(
+        "-n", "--pages",
+        type=int,
+        default=10,
+        help="Number of pages per degradation level (default: 10)",
+    )
+    synth_parser.add_argument(
+        "--levels",
+        nargs="+",
+        choices=list(DEGRADATION_LEVELS),
+        default=list(DEGRADATION_LEVELS),
+        help="Degradation levels to render (default: all)",
+    )
+    synth_parser.add_argument(
+        "--voicings",
+        nargs="?",
+        const=str(TEST_DB_PATH),
+        help=f"Build tabs from voicings in an XML chord database (default: {TEST_DB_PATH}) "
+             "instead of random chords",
+    )
+    synth_parser.add_argument(
+        "--dpi",
+        type=int,
+        default=DEFAULT_DPI,
+        help=f"Rendering resolution (default: {DEFAULT_DPI})",
+    )
+    synth_parser.add_argument(
+        "--font",
+        action="append",
+        help="Font file to render with; repeat to cycle through several fonts",
+    )
+    synth_parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed (default: 0)",
+    )
+    synth_parser.set_defaults(func=cmd_synth_corpus)
+
+    # bench command
+    bench_parser = subparsers.add_parser(
+        "bench",
+        help="Measure OCR throughput, latency and error rate over a labeled corpus",
+    )
+    bench_parser.add_argument(
+        "corpus",
+        help="Directory of tab images, each with a ground-truth .txt file of the same name",
+    )
+    bench_parser.add_argument(
+        "-p", "--profile",
+        help="Name of a tesseract config file in data/tessdata/configs",
+    )
+    bench_parser.add_argument(
+        "-t", "--timeout",
+        type=float,
+        help="Seconds allowed per image before tesseract is killed",
+    )
+    bench_parser.add_argument(
+        "--job-timeout",
+        type=float,
+        help="Seconds allowed for the whole run; remaining pages time out once it is used up",
+    )
+    bench_parser.set_defaults(func=cmd_bench)
+
+    # watch command
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="OCR and recognize tab images as they appear in a directory",
+    )
+    watch_parser.add_argument(
+        "directory",
+        help="Directory to watch; results are written next to each image",
+    )
+    watch_parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WATCH_WORKERS,
+        help=f"Images processed in parallel (default: {DEFAULT_WATCH_WORKERS})",
+    )
+    watch_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"Seconds between checks for new images (default: {DEFAULT_POLL_INTERVAL})",
+    )
+    watch_parser.add_argument(
+        "--polling",
+        action="store_true",
+        help="Poll the directory even where inotify is available",
+    )
+    watch_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Process the images already in the directory and exit",
+    )
+    watch_parser.add_argument(
+        "-p", "--profile",
+        help="Name of a tesseract config file in data/tessdata/configs",
+    )
+    watch_parser.add_argument(
+        "-t", "--timeout",
+        type=float,
+        help="Seconds allowed per image before tesseract is killed",
+    )
+    add_dedup_arguments(watch_parser)
+    watch_parser.set_defaults(func=cmd_watch)
+
     return parser
 
 
@@ -0,0 +1,103 @@
+# Deadlines for the OCR path
+# A job deadline bounds a whole batch, and per-page deadlines derived from it
+# bound each image through decoding and tesseract, so one pathological image
+# cannot stall a worker
+
+import threading
+import time
+from collections import Counter
+from typing import Self
+
+
+class OcrTimeoutError(RuntimeError):
+    """
+    Raised when OCR runs past its deadline.
+
+    Subclasses RuntimeError, so callers that treat every OCR failure alike keep
+    working, while callers that care can handle timeouts separately.
+
+    Attributes:
+        stage: The step that was running or about to run ('decode', 'ocr', ...).
+        partial_result: Text recognized before the deadline, if any.
+    """
+
+    def __init__(self, message: str, stage: str, partial_result: str | None = None):
+        super().__init__(message)
+        self.stage = stage
+        self.partial_result = partial_result
+
+
+class Deadline:
+    """
+    A point in time by which some work must finish.
+
+    A deadline without a time limit never expires. A child deadline never
+    expires later than its parent, so per-page budgets stay inside the job's.
+    """
+
+    def __init__(self, seconds: float | None = None, parent: Self | None = None):
+        """
+        Start a deadline.
+
+        Args:
+            seconds: Time allowed from now, or None for no limit of its own.
+            parent: Enclosing deadline this one must not outlive.
+        """
+        expires_at = None if seconds is None else time.monotonic() + seconds
+        if parent is not None and parent.expires_at is not None:
+            expires_at = parent.expires_at if expires_at is None else min(expires_at, parent.expires_at)
+        self.expires_at = expires_at
+
+    def child(self, seconds: float | None) -> Self:
+        """Return a deadline of at most the given seconds that ends no later than this one."""
+        return type(self)(seconds, parent=self)
+
+    def remaining(self) -> float | None:
+        """Return the seconds left (never negative), or None if there is no limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Return whether the deadline has passed."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, stage: str, record: bool = True) -> None:
+        """
+        Make sure there is time left before starting a step.
+
+        Args:
+            stage: The step about to run.
+            record: Count the timeout in timeout_stats(). Callers that check
+                many times for one image pass False and record it themselves.
+
+        Raises:
+            OcrTimeoutError: If the deadline has passed.
+        """
+        if self.expired():
+            if record:
+                record_timeout(stage)
+            raise OcrTimeoutError(f"Deadline exceeded before {stage}", stage)
+
+
+# Timeouts by stage since the process started (or since reset_timeout_stats)
+_timeout_stats: Counter[str] = Counter()
+_timeout_stats_lock = threading.Lock()
+
+
+def record_timeout(stage: str) -> None:
+    """Count a timeout in the given stage."""
+    with _timeout_stats_lock:
+        _timeout_stats[stage] += 1
+
+
+def timeout_stats() -> Counter[str]:
+    """Return a copy of the timeout counts by stage."""
+    with _timeout_stats_lock:
+        return Counter(_timeout_stats)
+
+
+def reset_timeout_stats() -> None:
+    """Clear the timeout counts."""
+    with _timeout_stats_lock:
+        _timeout_stats.clear()
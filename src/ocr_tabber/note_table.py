@@ -0,0 +1,110 @@
+# Columnar storage for the notes of a parsed tab
+# One NumPy array per field instead of a Python list per note, so long songs
+# take a few bytes per note and chords are found with vectorized operations
+
+from collections.abc import Sequence
+from typing import Self
+
+import numpy as np
+
+# Technique flags, set on the note a technique leads into
+HAMMER_ON = 1
+PULL_OFF = 2
+SLIDE = 4
+
+# Technique marks that may precede a note in a tab line, e.g. '5h7' or '5h-7'
+TECHNIQUE_MARKS = {'h': HAMMER_ON, 'p': PULL_OFF, '/': SLIDE}
+
+# Largest fret the fret column can hold. Larger numbers (e.g. OCR digit runs
+# that lost their hyphens) are stored as MAX_FRET; no chord uses such a fret,
+# so they still match nothing.
+MAX_FRET = int(np.iinfo(np.int16).max)
+
+
+class NoteTable:
+    """
+    Notes of a tab as parallel arrays.
+
+    Attributes:
+        string: String number of each note, 1 being the first tab line.
+        fret: Fret number of each note.
+        column: Position of each note from the left of its line.
+        flags: Bitmask of technique flags for each note.
+    """
+
+    __slots__ = ('column', 'flags', 'fret', 'string')
+
+    def __init__(
+        self,
+        string: Sequence[int] | np.ndarray,
+        fret: Sequence[int] | np.ndarray,
+        column: Sequence[int] | np.ndarray,
+        flags: Sequence[int] | np.ndarray | None = None,
+    ):
+        self.string = np.asarray(string, dtype=np.int8)
+        fret = np.asarray(fret)
+        if fret.dtype != np.int16:
+            fret = np.clip(fret, np.iinfo(np.int16).min, MAX_FRET).astype(np.int16)
+        self.fret = fret
+        self.column = np.asarray(column, dtype=np.int32)
+        self.flags = (
+            np.zeros(len(self.string), dtype=np.uint8)
+            if flags is None
+            else np.asarray(flags, dtype=np.uint8)
+        )
+
+        if not len(self.string) == len(self.fret) == len(self.column) == len(self.flags):
+            raise ValueError("NoteTable columns must all have the same length")
+
+    @classmethod
+    def from_notes(cls, notes: Sequence[Sequence[int]]) -> Self:
+        """Build a table from [string_num, fret_num, position] triplets."""
+        if not notes:
+            return cls([], [], [])
+        string, fret, column = zip(*notes, strict=True)
+        return cls(string, fret, column)
+
+    def to_notes(self) -> list[list[int]]:
+        """Return the notes as [string_num, fret_num, position] triplets."""
+        return np.column_stack((self.string, self.fret, self.column)).tolist()
+
+    def __len__(self) -> int:
+        return len(self.string)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the note data."""
+        return self.string.nbytes + self.fret.nbytes + self.column.nbytes + self.flags.nbytes
+
+    def take(self, indices: np.ndarray) -> Self:
+        """Return a new table with the notes at the given indices."""
+        return type(self)(
+            self.string[indices], self.fret[indices], self.column[indices], self.flags[indices]
+        )
+
+    def sorted_by_column(self) -> Self:
+        """Return the notes sorted by column, keeping line order within a column."""
+        return self.take(np.argsort(self.column, kind='stable'))
+
+    def chord_groups(self) -> list[np.ndarray]:
+        """
+        Find the chords in a table sorted by column.
+
+        Consecutive notes in the same column are played at the same time, so
+        every run of two or more of them is a chord. The later notes of a token
+        like '5h7' share its column but are played after it: a flagged note
+        right after a note on the same string and column is left out.
+
+        Returns:
+            Index arrays of the notes of each chord, in order.
+        """
+        if len(self) < 2:
+            return []
+        follow_up = np.zeros(len(self), dtype=bool)
+        follow_up[1:] = (self.flags[1:] != 0) & (np.diff(self.column) == 0) & (np.diff(self.string) == 0)
+        played = np.flatnonzero(~follow_up)
+        boundaries = np.flatnonzero(np.diff(self.column[played])) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(played)]))
+        keep = ends - starts >= 2
+        return [played[start:end] for start, end in zip(starts[keep], ends[keep], strict=True)]
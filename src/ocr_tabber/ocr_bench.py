@@ -0,0 +1,109 @@
+# Measures OCR throughput, latency and accuracy over a labeled corpus
+# Pages are grouped by the directory they are in, so a corpus written by
+# synth_corpus.py is reported per degradation level
+
+import math
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from ocr_tabber.autotune import character_error_rate, collect_labeled_corpus
+from ocr_tabber.deadline import OcrTimeoutError
+from ocr_tabber.ocr_tab import ocr_tab_image
+
+# Type alias for the OCR function under test: image_path -> text
+PageOcr = Callable[[str], str]
+
+
+@dataclass(frozen=True)
+class BenchStats:
+    """OCR results for one group of pages."""
+
+    level: str
+    pages: int
+    seconds: float  # Total wall time
+    p50: float  # Median per-page latency in seconds
+    p95: float  # 95th percentile per-page latency in seconds
+    cer: float  # Mean character error rate
+    timeouts: int = 0  # Pages that ran past their deadline
+
+    @property
+    def pages_per_second(self) -> float:
+        """Throughput over the group."""
+        return self.pages / self.seconds if self.seconds else float("inf")
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Return the q-th percentile of the values using the nearest-rank method.
+
+    Args:
+        values: Non-empty sequence of samples.
+        q: Percentile between 0 and 100.
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def bench_corpus(corpus_dir: Path, ocr: PageOcr = ocr_tab_image) -> list[BenchStats]:
+    """
+    Run OCR over every labeled page in a corpus and time it.
+
+    Latency is measured end to end, including image decoding. Pages that
+    time out are counted, and scored on whatever partial text they returned.
+
+    Args:
+        corpus_dir: Directory of images with ground-truth .txt files.
+        ocr: OCR function to benchmark.
+
+    Returns:
+        One BenchStats per directory holding pages, in path order.
+
+    Raises:
+        FileNotFoundError: If the corpus directory doesn't exist.
+        ValueError: If no labeled images are found.
+        IOError, RuntimeError: If OCR fails on a page.
+    """
+    groups: dict[str, list[tuple[float, float, bool]]] = {}
+
+    for img_path, truth in collect_labeled_corpus(corpus_dir):
+        level = img_path.parent.relative_to(corpus_dir).as_posix()
+        start = time.perf_counter()
+        try:
+            text = ocr(str(img_path))
+            timed_out = False
+        except OcrTimeoutError as e:
+            text = e.partial_result or ""
+            timed_out = True
+        elapsed = time.perf_counter() - start
+        groups.setdefault(level, []).append((elapsed, character_error_rate(truth, text), timed_out))
+
+    stats = []
+    for level, samples in groups.items():
+        latencies = [latency for latency, _, _ in samples]
+        stats.append(BenchStats(
+            level=level,
+            pages=len(samples),
+            seconds=sum(latencies),
+            p50=percentile(latencies, 50),
+            p95=percentile(latencies, 95),
+            cer=sum(cer for _, cer, _ in samples) / len(samples),
+            timeouts=sum(timed_out for _, _, timed_out in samples),
+        ))
+
+    return stats
+
+
+def format_report(stats: Sequence[BenchStats]) -> str:
+    """Format benchmark results as a plain-text table."""
+    lines = [
+        f"{'level':<12} {'pages':>6} {'pages/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'CER':>7} {'timeouts':>8}"
+    ]
+    for s in stats:
+        lines.append(
+            f"{s.level:<12} {s.pages:>6} {s.pages_per_second:>8.2f} "
+            f"{s.p50 * 1000:>8.1f} {s.p95 * 1000:>8.1f} {s.cer:>7.4f} {s.timeouts:>8}"
+        )
+    return "\n".join(lines)
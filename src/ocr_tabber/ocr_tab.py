@@ -2,19 +2,76 @@
 # Uses pytesseract for OCR
 
 import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Self
 
 import pytesseract
 from PIL import Image
 
+from ocr_tabber.deadline import Deadline, OcrTimeoutError, record_timeout
+
 # Get the data directory path relative to this module
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 TESSDATA_DIR = DATA_DIR / "tessdata"
+TESSDATA_CONFIGS_DIR = TESSDATA_DIR / "configs"
+
+# Characters that can appear in an ASCII guitar tab
+TAB_CHAR_WHITELIST = "0123456789ABCDEFGabcdefghp-/|"
+
+# Faster settings used when a page runs out of time: no dictionaries, half resolution
+FALLBACK_CONFIG = (
+    f"--tessdata-dir {TESSDATA_DIR} --psm 6 "
+    f"-c tessedit_char_whitelist={TAB_CHAR_WHITELIST} "
+    "-c load_system_dawg=0 -c load_freq_dawg=0"
+)
+FALLBACK_SHARE = 0.3  # Share of a page's time budget held back for the fallback
+
+# Config file variables that tesseract only applies reliably from the command line:
+# the CLI resets a config file's page segmentation mode of 6 to its own default
+PROFILE_MODE_OPTIONS = {
+    "tessedit_pageseg_mode": "--psm",
+    "tessedit_ocr_engine_mode": "--oem",
+}
 
 # Supported image file extensions
 SUPPORTED_IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.tif', '.webp'}
 
 
+class OcrText(str):
+    """
+    OCR output that also tells how it was produced.
+
+    Behaves exactly like the text itself, so callers that only need the text
+    can ignore the difference.
+
+    Attributes:
+        degraded: True if the page ran out of time and was recognized with
+            the faster, less accurate FALLBACK_CONFIG settings.
+    """
+
+    degraded: bool
+
+    def __new__(cls, text: str, degraded: bool = False) -> Self:
+        obj = super().__new__(cls, text)
+        obj.degraded = degraded
+        return obj
+
+
+@dataclass(frozen=True)
+class OcrWord:
+    """A word recognized by tesseract and its bounding box in pixels."""
+
+    text: str
+    left: int
+    top: int
+    width: int
+    height: int
+    conf: float
+
+
 def validate_image_path(image_path: str) -> Path:
     """
     Validate that the image path exists and has a supported extension.
@@ -43,47 +100,217 @@ def validate_image_path(image_path: str) -> Path:
     return img_path
 
 
-def ocr_tab_image(image_path: str) -> str:
+def build_tesseract_config(profile: str | None = None) -> str:
+    """
+    Build the tesseract command-line configuration for guitar tab recognition.
+
+    Without a profile, page segmentation and the character whitelist are passed
+    on the command line. With a profile, the settings come from the named config
+    file in ``data/tessdata/configs`` (e.g. one written by ``ocr-tabber autotune``),
+    except that its page segmentation and engine modes are passed as ``--psm``
+    and ``--oem``, which is the only way tesseract honours every value of them.
+
+    Args:
+        profile: Name of a config file in the tessdata configs directory.
+
+    Returns:
+        The configuration string to pass to pytesseract.
+
+    Raises:
+        FileNotFoundError: If the named profile doesn't exist.
+        ValueError: If the profile name is not a plain file name.
+        IOError: If the profile cannot be read.
+    """
+    if profile is None:
+        # Character whitelist restricts characters to ones found in guitar tabs
+        return (
+            f"--tessdata-dir {TESSDATA_DIR} "
+            "--psm 6 "  # PSM_SINGLE_BLOCK - assume a single uniform block of text
+            f"-c tessedit_char_whitelist={TAB_CHAR_WHITELIST}"
+        )
+
+    if not profile or Path(profile).name != profile:
+        raise ValueError(f"Invalid OCR profile name: {profile!r}")
+
+    profile_path = TESSDATA_CONFIGS_DIR / profile
+    if not profile_path.exists():
+        raise FileNotFoundError(f"OCR profile not found: {profile_path}")
+
+    try:
+        lines = profile_path.read_text().splitlines()
+    except Exception as e:
+        raise OSError(f"Failed to read OCR profile: {profile_path}") from e
+
+    options = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) == 2 and fields[0] in PROFILE_MODE_OPTIONS:
+            options.append(f"{PROFILE_MODE_OPTIONS[fields[0]]} {fields[1]} ")
+
+    return f"--tessdata-dir {TESSDATA_DIR} {''.join(options)}{profile}"
+
+
+@contextmanager
+def _tesseract_errors() -> Iterator[None]:
+    """Translate pytesseract failures into RuntimeError with a helpful message."""
+    try:
+        yield
+    except pytesseract.TesseractNotFoundError:
+        raise RuntimeError(
+            "Tesseract is not installed or not in PATH. "
+            "Please install Tesseract OCR: https://github.com/tesseract-ocr/tesseract"
+        ) from None
+    except RuntimeError as e:
+        # pytesseract kills the tesseract process before raising this
+        if str(e) != "Tesseract process timeout":
+            raise RuntimeError(f"OCR processing failed: {e}") from e
+        raise OcrTimeoutError("Tesseract exceeded its deadline and was killed", "ocr") from None
+    except Exception as e:
+        raise RuntimeError(f"OCR processing failed: {e}") from e
+
+
+def _tesseract_timeout(timeout: float | None) -> float:
+    """
+    Convert a time budget to pytesseract's timeout argument (0 means none).
+
+    Raises:
+        OcrTimeoutError: If the budget is already used up.
+    """
+    if timeout is None:
+        return 0
+    if timeout <= 0:
+        raise OcrTimeoutError("Deadline exceeded before ocr", "ocr")
+    return timeout
+
+
+def run_tesseract(image: Image.Image, config: str, timeout: float | None = None) -> str:
+    """
+    Run tesseract on an already opened image.
+
+    Args:
+        image: The image to recognize.
+        config: Tesseract configuration string (see build_tesseract_config).
+        timeout: Seconds after which tesseract is killed, or None for no limit.
+
+    Returns:
+        The OCR result as a string.
+
+    Raises:
+        OcrTimeoutError: If tesseract runs out of time. It is not counted in
+            timeout_stats(); the page-level caller counts it once per image.
+        RuntimeError: If tesseract is missing or fails.
+    """
+    seconds = _tesseract_timeout(timeout)
+    with _tesseract_errors():
+        return pytesseract.image_to_string(image, lang="eng", config=config, timeout=seconds)
+
+
+def run_tesseract_words(image: Image.Image, config: str, timeout: float | None = None) -> list[OcrWord]:
+    """
+    Run tesseract on an already opened image and return word boxes.
+
+    Args:
+        image: The image to recognize.
+        config: Tesseract configuration string (see build_tesseract_config).
+        timeout: Seconds after which tesseract is killed, or None for no limit.
+
+    Returns:
+        The recognized words with their positions in the image.
+
+    Raises:
+        OcrTimeoutError: If tesseract runs out of time. It is not counted in
+            timeout_stats(); the page-level caller counts it once per image.
+        RuntimeError: If tesseract is missing or fails.
+    """
+    seconds = _tesseract_timeout(timeout)
+    with _tesseract_errors():
+        data = pytesseract.image_to_data(
+            image, lang="eng", config=config, output_type=pytesseract.Output.DICT, timeout=seconds
+        )
+
+    return [
+        OcrWord(text, left, top, width, height, float(conf))
+        for text, left, top, width, height, conf in zip(
+            data["text"], data["left"], data["top"], data["width"], data["height"], data["conf"],
+            strict=True,
+        )
+        if text.strip()
+    ]
+
+
+def ocr_tab_image(
+    image_path: str,
+    profile: str | None = None,
+    timeout: float | None = None,
+    deadline: Deadline | None = None,
+    fallback: bool = True,
+) -> str:
     """
     Perform OCR on a guitar tab image and return the recognized text.
 
+    With a time limit, part of the page's budget is held back: if tesseract
+    runs out of time with the configured settings it is killed, and the page
+    is recognized again at half resolution with FALLBACK_CONFIG in the time
+    left. Such pages are counted as 'degraded' in timeout_stats(), and their
+    text is returned as an OcrText with ``degraded`` set.
+
     Args:
         image_path: Path to the image file containing guitar tablature.
+        profile: Optional name of a tesseract config file in
+            ``data/tessdata/configs`` to use instead of the built-in settings.
+        timeout: Seconds allowed for this page, or None for no limit.
+        deadline: Deadline of the job this page belongs to.
+        fallback: Retry with the faster fallback settings after a timeout.
 
     Returns:
         The OCR result as a string.
 
     Raises:
-        FileNotFoundError: If the image file doesn't exist.
+        FileNotFoundError: If the image file or profile doesn't exist.
         ValueError: If the file extension is not supported.
         IOError: If the image cannot be read.
+        OcrTimeoutError: If the page runs past its deadline.
+        RuntimeError: If OCR fails.
     """
+    page_deadline = Deadline(timeout, parent=deadline)
     img_path = validate_image_path(image_path)
+    custom_config = build_tesseract_config(profile)
 
+    page_deadline.check("decode")
     try:
         image = Image.open(img_path)
+        image.load()
     except Exception as e:
         raise OSError(f"Failed to open image file: {image_path}") from e
 
-    # Configure tesseract for guitar tab recognition
-    # Character whitelist restricts characters to ones found in guitar tabs
-    custom_config = (
-        f"--tessdata-dir {TESSDATA_DIR} "
-        "--psm 6 "  # PSM_SINGLE_BLOCK - assume a single uniform block of text
-        "-c tessedit_char_whitelist=0123456789ABCDEFGabcdefghp-/|"
-    )
+    page_deadline.check("ocr")
+    remaining = page_deadline.remaining()
+    if remaining is None:
+        return run_tesseract(image, custom_config)
+
+    if not fallback:
+        try:
+            return run_tesseract(image, custom_config, timeout=remaining)
+        except OcrTimeoutError:
+            record_timeout("ocr")
+            raise
 
     try:
-        result = pytesseract.image_to_string(image, lang="eng", config=custom_config)
-    except pytesseract.TesseractNotFoundError:
-        raise RuntimeError(
-            "Tesseract is not installed or not in PATH. "
-            "Please install Tesseract OCR: https://github.com/tesseract-ocr/tesseract"
-        ) from None
-    except Exception as e:
-        raise RuntimeError(f"OCR processing failed: {e}") from e
+        return run_tesseract(image, custom_config, timeout=remaining * (1 - FALLBACK_SHARE))
+    except OcrTimeoutError:
+        record_timeout("ocr")
+
+    reduced = image.reduce(2) if min(image.size) >= 2 else image
+    try:
+        result = run_tesseract(reduced, FALLBACK_CONFIG, timeout=page_deadline.remaining())
+    except OcrTimeoutError as e:
+        record_timeout("fallback")
+        raise OcrTimeoutError(
+            f"OCR of {image_path} exceeded its deadline, including the fallback", "fallback"
+        ) from e
 
-    return result
+    record_timeout("degraded")
+    return OcrText(result, degraded=True)
 
 
 def main() -> None:
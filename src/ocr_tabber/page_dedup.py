@@ -0,0 +1,408 @@
+# Skips OCR for pages that were already recognized
+# Pages are identified by a perceptual hash (dHash or pHash), so rescans and
+# recompressed copies of a page reuse its earlier OCR result. The hashes are
+# kept in a local index file, with the OCR settings each page was recognized
+# with, and compared by Hamming distance.
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+from PIL import Image
+
+from ocr_tabber.ocr_tab import OcrText
+
+# Type alias for the OCR function being deduplicated: image_path -> text
+PageOcr = Callable[[str], str]
+
+# Tab pages all look alike at 8x8, so hashes are 16x16 (256 bits). On synthetic
+# pages, rescans and recompressed copies stay within about 20 bits of the
+# original with pHash, while different pages are more than 80 bits apart.
+DEFAULT_HASH = "phash"
+DEFAULT_HASH_SIZE = 16
+DEFAULT_THRESHOLD = 24  # Maximum Hamming distance between duplicates
+
+INDEX_VERSION = 2  # Version 2 added the OCR settings of each entry
+DEFAULT_SAVE_EVERY = 25  # New pages recognized between saves of the index
+
+
+def _load_gray(image: Image.Image, size: tuple[int, int]) -> np.ndarray:
+    """Downscale an image to grayscale pixels as a float array of shape (height, width)."""
+    # Let the JPEG decoder skip most of the work when the image isn't loaded yet
+    image.draft("L", (size[0] * 4, size[1] * 4))
+    small = image.convert("L").resize(size, Image.Resampling.BOX)
+    return np.asarray(small, dtype=np.float64)
+
+
+def dhash(image: Image.Image, hash_size: int = DEFAULT_HASH_SIZE) -> bytes:
+    """
+    Compute the difference hash of an image.
+
+    Each bit tells whether a pixel of the downscaled image is brighter than
+    its right-hand neighbour.
+
+    Returns:
+        A hash of hash_size * hash_size bits.
+    """
+    pixels = _load_gray(image, (hash_size + 1, hash_size))
+    return np.packbits(pixels[:, 1:] > pixels[:, :-1]).tobytes()
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Return the n x n DCT-II basis matrix."""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    return np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+
+
+def phash(image: Image.Image, hash_size: int = DEFAULT_HASH_SIZE) -> bytes:
+    """
+    Compute the DCT-based perceptual hash of an image.
+
+    Each bit tells whether a low-frequency DCT coefficient of the downscaled
+    image is above the median of those coefficients.
+
+    Returns:
+        A hash of hash_size * hash_size bits.
+    """
+    n = hash_size * 4
+    dct = _dct_matrix(n)
+    coefficients = (dct @ _load_gray(image, (n, n)) @ dct.T)[:hash_size, :hash_size]
+    return np.packbits(coefficients > np.median(coefficients)).tobytes()
+
+
+HASH_FUNCTIONS: dict[str, Callable[[Image.Image, int], bytes]] = {
+    "dhash": dhash,
+    "phash": phash,
+}
+
+
+def hash_image_file(image_path: str, kind: str = DEFAULT_HASH, hash_size: int = DEFAULT_HASH_SIZE) -> bytes:
+    """
+    Compute the perceptual hash of an image file.
+
+    Raises:
+        IOError: If the image cannot be read.
+    """
+    try:
+        with Image.open(image_path) as image:
+            return HASH_FUNCTIONS[kind](image, hash_size)
+    except Exception as e:
+        raise OSError(f"Failed to open image file: {image_path}") from e
+
+
+def hamming_distance(a: bytes, b: bytes) -> int:
+    """Return the number of differing bits between two hashes."""
+    return (int.from_bytes(a) ^ int.from_bytes(b)).bit_count()
+
+
+def settings_key(**settings: object) -> str:
+    """
+    Describe the OCR settings that shape a page's text, e.g. 'profile=tabs tiled=False'.
+
+    Index entries only match lookups made with the same key, so a page
+    recognized with one profile or mode is not reused for another.
+    """
+    return " ".join(f"{name}={value}" for name, value in sorted(settings.items()))
+
+
+@dataclass
+class DedupStats:
+    """How much OCR work the index saved."""
+
+    hits: int = 0
+    misses: int = 0
+    seconds_saved: float = 0.0  # OCR time the reused results originally took
+
+    def report(self) -> str:
+        """Summarize the stats in one line."""
+        pages = self.hits + self.misses
+        return (
+            f"Reused OCR results for {self.hits} of {pages} pages, "
+            f"saving about {self.seconds_saved:.1f}s of OCR"
+        )
+
+
+@dataclass(frozen=True)
+class _IndexEntries:
+    """Immutable snapshot of the contents of a PageHashIndex."""
+
+    hashes: np.ndarray  # One row of hash bytes per page, read-only
+    texts: tuple[str, ...]
+    seconds: tuple[float, ...]  # OCR time each page took
+    settings: np.ndarray  # Settings key of each page, read-only
+
+    @classmethod
+    def build(
+        cls,
+        hashes: np.ndarray,
+        texts: Sequence[str],
+        seconds: Sequence[float],
+        settings: Sequence[str] | np.ndarray,
+    ) -> Self:
+        """Freeze the arrays and sequences of a new snapshot."""
+        hashes = np.asarray(hashes, dtype=np.uint8)
+        settings_array = np.asarray(settings, dtype=str)
+        hashes.setflags(write=False)
+        settings_array.setflags(write=False)
+        return cls(hashes, tuple(texts), tuple(seconds), settings_array)
+
+
+class PageHashIndex:
+    """
+    Local index of page hashes and the OCR results they were recognized as.
+
+    Each entry also records the settings key (see settings_key) of the OCR
+    run that produced it, and only matches lookups with the same key.
+
+    Lookups compare a hash against every stored hash at once with NumPy.
+    Safe to share between threads: the entries are copy-on-write, so lookups
+    read the current snapshot without locking, and add publishes a new one.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        kind: str = DEFAULT_HASH,
+        hash_size: int = DEFAULT_HASH_SIZE,
+    ):
+        """
+        Open an index, loading it from path if the file exists.
+
+        Args:
+            path: File the index is kept in, or None for an in-memory index.
+            kind: Hash function, a key of HASH_FUNCTIONS.
+            hash_size: Hash side length; hashes have hash_size**2 bits.
+
+        Raises:
+            ValueError: If the hash kind is unknown or doesn't match the file,
+                or the file is from another version.
+            IOError: If the index file cannot be read.
+        """
+        if kind not in HASH_FUNCTIONS:
+            raise ValueError(
+                f"Unknown hash: {kind}. Available hashes: {', '.join(HASH_FUNCTIONS)}"
+            )
+
+        self.path = path
+        self.kind = kind
+        self.hash_size = hash_size
+        self._add_lock = threading.Lock()  # Serializes writers only
+        self._save_lock = threading.Lock()
+        self._saved_count = 0  # Entries in the file as last written
+        self._entries = _IndexEntries.build(
+            np.zeros((0, hash_size * hash_size // 8), dtype=np.uint8), [], [], []
+        )
+
+        if path is not None and path.exists():
+            self._load(path)
+
+    def _load(self, path: Path) -> None:
+        """Read the index from its file."""
+        try:
+            data = json.loads(path.read_text())
+            entries = data["entries"]
+            version, kind, hash_size = data["version"], data["kind"], data["hash_size"]
+        except Exception as e:
+            raise OSError(f"Failed to read page hash index: {path}") from e
+
+        if version != INDEX_VERSION:
+            raise ValueError(
+                f"Page hash index {path} is version {version}, not {INDEX_VERSION} "
+                "(delete it to start a new one)"
+            )
+
+        if (kind, hash_size) != (self.kind, self.hash_size):
+            raise ValueError(
+                f"Page hash index {path} uses {kind} with size {hash_size}, "
+                f"not {self.kind} with size {self.hash_size}"
+            )
+
+        if entries:
+            self._entries = _IndexEntries.build(
+                np.array([np.frombuffer(bytes.fromhex(entry["hash"]), dtype=np.uint8) for entry in entries]),
+                [entry["text"] for entry in entries],
+                [entry["seconds"] for entry in entries],
+                [entry["settings"] for entry in entries],
+            )
+        self._saved_count = len(entries)
+
+    def save(self) -> None:
+        """
+        Write the index to its file atomically.
+
+        The current snapshot is serialized without holding any lock that
+        lookups or add take, so concurrent callers don't wait on the disk.
+
+        Raises:
+            IOError: If the file cannot be written.
+        """
+        if self.path is None:
+            return
+
+        entries = self._entries
+        content = json.dumps({
+            "version": INDEX_VERSION,
+            "kind": self.kind,
+            "hash_size": self.hash_size,
+            "entries": [
+                {"hash": row.tobytes().hex(), "text": text, "seconds": seconds, "settings": settings}
+                for row, text, seconds, settings in zip(
+                    entries.hashes, entries.texts, entries.seconds, entries.settings.tolist(), strict=True
+                )
+            ],
+        })
+
+        with self._save_lock:
+            # Entries are only ever added, so a longer snapshot is newer
+            if len(entries.texts) < self._saved_count:
+                return
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                tmp_path.write_text(content)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                raise OSError(f"Failed to write page hash index: {self.path}") from e
+            self._saved_count = len(entries.texts)
+
+    def __len__(self) -> int:
+        return len(self._entries.texts)
+
+    def hash_file(self, image_path: str) -> bytes:
+        """Hash an image file with this index's hash function."""
+        return hash_image_file(image_path, self.kind, self.hash_size)
+
+    def lookup(
+        self,
+        page_hash: bytes,
+        threshold: int = DEFAULT_THRESHOLD,
+        settings: str = "",
+    ) -> tuple[str, float] | None:
+        """
+        Find the closest stored page within the threshold.
+
+        Args:
+            page_hash: Hash of the page, from hash_file.
+            threshold: Maximum Hamming distance for a page to count as a duplicate.
+            settings: Settings key of the OCR run; only entries with the same key match.
+
+        Returns:
+            (text, ocr_seconds) of the closest page, or None if none is close enough.
+        """
+        entries = self._entries
+        if not entries.texts:
+            return None
+
+        query = np.frombuffer(page_hash, dtype=np.uint8)
+        distances = np.bitwise_count(entries.hashes ^ query).sum(axis=1, dtype=np.int64)
+        distances[entries.settings != settings] = np.iinfo(np.int64).max
+        best = int(np.argmin(distances))
+        if distances[best] > threshold:
+            return None
+        return entries.texts[best], entries.seconds[best]
+
+    def add(self, page_hash: bytes, text: str, seconds: float, settings: str = "") -> None:
+        """Store the OCR result of a page, recognized with the given settings key."""
+        row = np.frombuffer(page_hash, dtype=np.uint8)[None, :]
+        with self._add_lock:
+            entries = self._entries
+            self._entries = _IndexEntries.build(
+                np.concatenate((entries.hashes, row)),
+                entries.texts + (text,),
+                entries.seconds + (seconds,),
+                np.append(entries.settings, settings),
+            )
+
+
+class DedupingOcr:
+    """
+    OCR function that reuses results for near-duplicate pages.
+
+    Wraps another OCR function with the same signature, so it can be passed
+    wherever one is expected (e.g. to the watcher or the benchmark). Pages
+    that fell back to the degraded timeout settings (see OcrText) are not
+    added to the index, so a later copy gets a full-quality OCR run.
+
+    New pages are saved to the index file in batches; call close when done
+    to save the rest.
+    """
+
+    def __init__(
+        self,
+        index: PageHashIndex,
+        ocr: PageOcr,
+        threshold: int = DEFAULT_THRESHOLD,
+        settings: str = "",
+        save_every: int = DEFAULT_SAVE_EVERY,
+    ):
+        """
+        Args:
+            index: Index of already recognized pages.
+            ocr: OCR function to call for pages not in the index.
+            threshold: Maximum Hamming distance for a page to count as a duplicate.
+            settings: Settings key of the wrapped OCR function (see settings_key).
+            save_every: Save the index after this many new pages, or only on
+                close if 0.
+        """
+        self.index = index
+        self.ocr = ocr
+        self.threshold = threshold
+        self.settings = settings
+        self.save_every = save_every
+        self.stats = DedupStats()
+        self._stats_lock = threading.Lock()
+        self._unsaved = 0
+
+    def __call__(self, image_path: str) -> str:
+        """
+        Return the OCR text of a page, reusing a near-duplicate's if there is one.
+
+        Raises:
+            Whatever the wrapped OCR function raises, and IOError if the image
+            cannot be hashed or the index cannot be saved.
+        """
+        page_hash = self.index.hash_file(image_path)
+        match = self.index.lookup(page_hash, self.threshold, self.settings)
+        if match is not None:
+            text, seconds = match
+            with self._stats_lock:
+                self.stats.hits += 1
+                self.stats.seconds_saved += seconds
+            return text
+
+        start = time.perf_counter()
+        text = self.ocr(image_path)
+        with self._stats_lock:
+            self.stats.misses += 1
+
+        # Text from the timeout fallback settings is not worth reusing
+        if isinstance(text, OcrText) and text.degraded:
+            return text
+
+        self.index.add(page_hash, text, time.perf_counter() - start, self.settings)
+        with self._stats_lock:
+            self._unsaved += 1
+            save = self._unsaved == self.save_every
+            if save:
+                self._unsaved = 0
+        if save:
+            self.index.save()
+        return text
+
+    def close(self) -> None:
+        """
+        Save the pages added since the last save.
+
+        Raises:
+            IOError: If the index cannot be saved.
+        """
+        with self._stats_lock:
+            unsaved, self._unsaved = self._unsaved, 0
+        if unsaved:
+            self.index.save()
@@ -0,0 +1,220 @@
+# Reusable, thread-safe entry point for embedding OCR-tabber in other programs
+# A session loads the chord index and sets up the OCR function once, then
+# serves any number of concurrent recognize calls, returning results instead
+# of printing them.
+
+import functools
+import threading
+from collections import Counter
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+from ocr_tabber.chord_recognizer import (
+    CHORD_DB_PATH,
+    ChordIndex,
+    ChordMatch,
+    StringTuning,
+    parse_tab_table,
+    recognize_chords,
+)
+from ocr_tabber.deadline import OcrTimeoutError
+from ocr_tabber.ocr_tab import ocr_tab_image
+from ocr_tabber.page_dedup import DEFAULT_THRESHOLD, DedupingOcr, PageHashIndex, settings_key
+
+# Type alias for the OCR function: image_path -> text
+PageOcr = Callable[[str], str]
+
+DEFAULT_SESSION_WORKERS = 4
+
+# Usage counters kept by a session
+STAT_NAMES = ("texts", "images", "chords", "timed_out")
+
+
+@dataclass(frozen=True)
+class TabResult:
+    """Chords recognized in one tab."""
+
+    source: str  # Image path, or the description passed with the text
+    text: str  # The ASCII tab (the OCR output for images)
+    key: StringTuning
+    chords: list[ChordMatch]  # In playing order
+
+
+class TabberSession:
+    """
+    Everything needed to recognize tabs, loaded once and shared.
+
+    The chord index is immutable and the OCR function keeps no per-call
+    state, so any number of threads can call one session at the same time.
+    Usage counters are kept per thread, so calls don't take a shared lock;
+    a lock is only taken the first time a thread calls, and by stats.
+    """
+
+    def __init__(
+        self,
+        chord_index: ChordIndex,
+        ocr: PageOcr | None = None,
+        profile: str | None = None,
+        timeout: float | None = None,
+        dedup_index: PageHashIndex | None = None,
+        dedup_threshold: int = DEFAULT_THRESHOLD,
+        workers: int = DEFAULT_SESSION_WORKERS,
+    ):
+        """
+        Args:
+            chord_index: Index of the chord database.
+            ocr: OCR function to use; defaults to ocr_tab_image with the
+                profile and timeout below.
+            profile: Name of a tesseract config file (see ocr_tab_image).
+            timeout: Seconds allowed per image, or None for no limit.
+            dedup_index: Page hash index for reusing the OCR results of
+                near-duplicate pages, or None to OCR every page. Entries are
+                keyed by the profile; with a custom ocr function, keep a
+                separate index per function. Call close to save it.
+            dedup_threshold: Maximum Hamming distance between duplicate pages.
+            workers: Number of tabs recognized in parallel by the batch methods.
+        """
+        settings = ""
+        if ocr is None:
+            ocr = functools.partial(ocr_tab_image, profile=profile, timeout=timeout)
+            settings = settings_key(profile=profile)
+        if dedup_index is not None:
+            ocr = DedupingOcr(dedup_index, ocr, dedup_threshold, settings)
+
+        self.chord_index = chord_index
+        self.ocr = ocr
+        self.workers = workers
+        self._local = threading.local()
+        self._thread_stats: list[tuple[threading.Thread, Counter[str]]] = []
+        self._retired_stats: Counter[str] = Counter()  # Of threads that have exited
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, db_path: Path = CHORD_DB_PATH, **kwargs) -> Self:
+        """
+        Load the chord database and start a session with it.
+
+        Args:
+            db_path: Path to the chord database pickle file.
+            **kwargs: Other TabberSession arguments.
+
+        Raises:
+            FileNotFoundError: If the database file doesn't exist.
+            IOError: If the database cannot be read or unpickled.
+        """
+        return cls(ChordIndex.load(db_path), **kwargs)
+
+    def close(self) -> None:
+        """
+        Save the dedup index, if the session has one.
+
+        Raises:
+            IOError: If the index cannot be saved.
+        """
+        if isinstance(self.ocr, DedupingOcr):
+            self.ocr.close()
+
+    def _count(self, **counts: int) -> None:
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            # Every name is present from the start, so stats can read the
+            # counter while this thread updates it
+            stats = self._local.stats = Counter(dict.fromkeys(STAT_NAMES, 0))
+            with self._stats_lock:
+                live = []
+                for thread, thread_stats in self._thread_stats:
+                    if thread.is_alive():
+                        live.append((thread, thread_stats))
+                    else:
+                        self._retired_stats.update(thread_stats)
+                live.append((threading.current_thread(), stats))
+                self._thread_stats = live
+        for name, count in counts.items():
+            stats[name] += count
+
+    def stats(self) -> Counter[str]:
+        """Return the counts of 'texts', 'images', 'chords' and 'timed_out', summed over threads."""
+        with self._stats_lock:
+            total = Counter(self._retired_stats)
+            for _, thread_stats in self._thread_stats:
+                total.update(thread_stats)
+        return +total
+
+    def recognize_text(self, text: str, source: str = "tab text") -> TabResult:
+        """
+        Recognize the chords in an ASCII tab.
+
+        Args:
+            text: The ASCII tab.
+            source: Description of where the text came from, used in error messages.
+
+        Raises:
+            ValueError: If the text has no tab lines or more than 6 strings.
+        """
+        key, notes = parse_tab_table(text, source)
+        chords = recognize_chords(key, notes, self.chord_index)
+        self._count(texts=1, chords=len(chords))
+        return TabResult(source, text, key, chords)
+
+    def recognize_image(self, image_path: str | Path) -> TabResult:
+        """
+        OCR a tab image and recognize its chords.
+
+        Raises:
+            FileNotFoundError: If the image file doesn't exist.
+            ValueError: If the image format is not supported, or the OCR
+                output has no tab lines.
+            IOError: If the image cannot be read.
+            OcrTimeoutError: If OCR runs past the session's timeout.
+            RuntimeError: If OCR fails.
+        """
+        try:
+            text = self.ocr(str(image_path))
+        except OcrTimeoutError:
+            self._count(timed_out=1)
+            raise
+
+        key, notes = parse_tab_table(text, f"OCR output of {image_path}")
+        chords = recognize_chords(key, notes, self.chord_index)
+        self._count(images=1, chords=len(chords))
+        return TabResult(str(image_path), text, key, chords)
+
+    def recognize_texts(self, texts: Sequence[str]) -> list[TabResult]:
+        """
+        Recognize the chords in several ASCII tabs in parallel.
+
+        Returns:
+            One TabResult per text, in input order.
+
+        Raises:
+            ValueError: If any text has no tab lines or more than 6 strings.
+        """
+        sources = [f"tab text {i}" for i in range(len(texts))]
+        return self._map(self.recognize_text, texts, sources)
+
+    def recognize_images(self, image_paths: Sequence[str | Path]) -> list[TabResult]:
+        """
+        OCR several tab images and recognize their chords in parallel.
+
+        Returns:
+            One TabResult per image, in input order.
+
+        Raises:
+            The first error raised for any image (see recognize_image); images
+            not yet started are skipped.
+        """
+        return self._map(self.recognize_image, image_paths)
+
+    def _map(self, function: Callable[..., TabResult], *iterables: Sequence) -> list[TabResult]:
+        """Apply function across the inputs on the worker pool, keeping input order."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(function, *args) for args in zip(*iterables, strict=True)]
+            try:
+                return [future.result() for future in futures]
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
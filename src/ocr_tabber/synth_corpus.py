@@ -0,0 +1,281 @@
+# Renders ASCII guitar tabs to images with exact ground truth
+# Used to build corpora for measuring OCR accuracy and speed (see ocr_bench.py)
+# Tabs are random or built from chord voicings in the XML chord database
+
+import random
+import xml.etree.ElementTree as ET
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+# Type alias for a chord voicing: fret per string from thickest to thinnest
+# (EADGBE for standard E tuning), None for a string that isn't played
+Voicing = list[int | None]
+
+# Get the data directory path relative to this module
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+TEST_DB_PATH = DATA_DIR / "testDB.xml"
+
+# String names as written in a tab, thinnest string first
+TAB_STRING_NAMES = ['e', 'B', 'G', 'D', 'A', 'E']
+
+MAX_RANDOM_FRET = 15
+DEFAULT_DPI = 300
+DEFAULT_FONT_SIZE_PT = 12
+
+
+@dataclass(frozen=True)
+class Degradation:
+    """Scan artefacts applied to a rendered tab image."""
+
+    skew_degrees: float = 0.0
+    blur_radius: float = 0.0
+    noise: float = 0.0  # Fraction of pixels replaced by black or white specks
+
+
+# Named degradation levels, from a perfect render to a poor scan
+DEGRADATION_LEVELS: dict[str, Degradation] = {
+    "clean": Degradation(),
+    "mild": Degradation(skew_degrees=0.5, blur_radius=0.5, noise=0.005),
+    "moderate": Degradation(skew_degrees=1.5, blur_radius=1.0, noise=0.02),
+    "heavy": Degradation(skew_degrees=3.0, blur_radius=1.5, noise=0.05),
+}
+
+
+def load_voicings(xml_path: Path = TEST_DB_PATH) -> list[Voicing]:
+    """
+    Load every chord voicing from an XML chord database.
+
+    Args:
+        xml_path: Path to a Gnome Guitar XML chord database.
+
+    Returns:
+        List of voicings, one per <voiceing> element.
+
+    Raises:
+        FileNotFoundError: If the XML file doesn't exist.
+        IOError: If the XML file cannot be read or parsed.
+        ValueError: If the database contains no voicings.
+    """
+    if not xml_path.exists():
+        raise FileNotFoundError(f"XML database not found: {xml_path}")
+
+    try:
+        root = ET.parse(xml_path).getroot()
+    except ET.ParseError as e:
+        raise OSError(f"Failed to parse XML database: {xml_path}") from e
+    except Exception as e:
+        raise OSError(f"Failed to read XML database: {xml_path}") from e
+
+    voicings = []
+    for voicing in root.findall('./chord/voiceing'):
+        frets = [g_str.findtext('fretNo') for g_str in voicing.findall('guitarString')]
+        if len(frets) == len(TAB_STRING_NAMES):
+            voicings.append([int(fret) if fret else None for fret in frets])
+
+    if not voicings:
+        raise ValueError(f"No chord voicings found in XML database: {xml_path}")
+
+    return voicings
+
+
+def random_voicing(rng: random.Random) -> Voicing:
+    """Return a random (not necessarily playable) voicing with at least two notes."""
+    while True:
+        voicing = [
+            rng.randint(0, MAX_RANDOM_FRET) if rng.random() < 0.7 else None
+            for _ in TAB_STRING_NAMES
+        ]
+        if sum(fret is not None for fret in voicing) >= 2:
+            return voicing
+
+
+def render_tab_text(voicings: Sequence[Voicing], chords_per_system: int = 8) -> str:
+    """
+    Write voicings out as ASCII tab, one chord per column.
+
+    Chords are split into systems of six lines separated by a blank line.
+
+    Args:
+        voicings: Chords to write, in playing order.
+        chords_per_system: Number of chords on each system.
+
+    Returns:
+        The ASCII tab text.
+    """
+    systems = []
+    for start in range(0, len(voicings), chords_per_system):
+        chords = voicings[start:start + chords_per_system]
+        widths = [max(len(str(fret)) for fret in chord if fret is not None) for chord in chords]
+
+        lines = []
+        # Voicings go from thickest to thinnest string, tabs are written the other way
+        for string_index, name in enumerate(TAB_STRING_NAMES):
+            cells = []
+            for chord, width in zip(chords, widths, strict=True):
+                fret = chord[len(TAB_STRING_NAMES) - 1 - string_index]
+                cells.append(('' if fret is None else str(fret)).ljust(width, '-'))
+            lines.append(f"{name}|-" + "---".join(cells) + "-|")
+        systems.append("\n".join(lines))
+
+    return "\n\n".join(systems) + "\n"
+
+
+def load_font(font_path: Path | None, size_px: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """
+    Load a TrueType font at the given pixel size.
+
+    Args:
+        font_path: Path to a TrueType/OpenType font, or None for Pillow's default font.
+        size_px: Font size in pixels.
+
+    Raises:
+        IOError: If the font cannot be loaded.
+    """
+    if font_path is None:
+        return ImageFont.load_default(size=size_px)
+
+    try:
+        return ImageFont.truetype(str(font_path), size_px)
+    except Exception as e:
+        raise OSError(f"Failed to load font: {font_path}") from e
+
+
+def render_tab_image(
+    text: str,
+    dpi: int = DEFAULT_DPI,
+    font_path: Path | None = None,
+    font_size_pt: float = DEFAULT_FONT_SIZE_PT,
+) -> Image.Image:
+    """
+    Render ASCII tab text to a grayscale image.
+
+    Characters are placed on a fixed grid so columns stay aligned with
+    proportional fonts too.
+
+    Args:
+        text: ASCII tab text.
+        dpi: Resolution the page is rendered at.
+        font_path: Path to a font file, or None for Pillow's default font.
+        font_size_pt: Font size in points.
+
+    Returns:
+        A mode "L" image with black text on white.
+    """
+    font = load_font(font_path, max(1, round(font_size_pt * dpi / 72)))
+    cell_width = max(font.getbbox(char)[2] for char in "0123456789-|eBGDAE")
+    ascent, descent = font.getmetrics()
+    line_height = round((ascent + descent) * 1.2)
+    margin = dpi // 4
+
+    lines = text.splitlines()
+    width = 2 * margin + cell_width * max((len(line) for line in lines), default=0)
+    height = 2 * margin + line_height * len(lines)
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for row, line in enumerate(lines):
+        for col, char in enumerate(line):
+            draw.text((margin + col * cell_width, margin + row * line_height), char, font=font, fill=0)
+
+    return image
+
+
+def degrade_image(image: Image.Image, degradation: Degradation, rng: random.Random) -> Image.Image:
+    """
+    Apply skew, blur and speckle noise to a rendered tab image.
+
+    Args:
+        image: A mode "L" image.
+        degradation: The artefacts to apply.
+        rng: Random source for the skew direction and noise pattern.
+
+    Returns:
+        The degraded image (the input is not modified).
+    """
+    result = image.copy()
+
+    if degradation.skew_degrees:
+        angle = degradation.skew_degrees * rng.choice((-1, 1))
+        result = result.rotate(angle, resample=Image.Resampling.BICUBIC, expand=True, fillcolor=255)
+
+    if degradation.blur_radius:
+        result = result.filter(ImageFilter.GaussianBlur(degradation.blur_radius))
+
+    if degradation.noise:
+        noise = Image.frombytes("L", result.size, rng.randbytes(result.width * result.height))
+        threshold = round(degradation.noise * 128)
+        result.paste(0, mask=noise.point(lambda v: 255 if v < threshold else 0, "1"))
+        result.paste(255, mask=noise.point(lambda v: 255 if v >= 256 - threshold else 0, "1"))
+
+    return result
+
+
+def generate_corpus(
+    output_dir: Path,
+    pages: int,
+    levels: Sequence[str] = tuple(DEGRADATION_LEVELS),
+    voicing_pool: Sequence[Voicing] | None = None,
+    chords_per_page: int = 32,
+    dpi: int = DEFAULT_DPI,
+    fonts: Sequence[Path | None] = (None,),
+    seed: int = 0,
+) -> list[Path]:
+    """
+    Write a labeled corpus of tab images, one subdirectory per degradation level.
+
+    Every level gets the same tabs, so results are comparable across levels.
+    Each image is written as ``<level>/page_NNNN.png`` next to its ground
+    truth in ``<level>/page_NNNN.txt``.
+
+    Args:
+        output_dir: Directory to write the corpus to.
+        pages: Number of pages per level.
+        levels: Names of degradation levels from DEGRADATION_LEVELS.
+        voicing_pool: Voicings to draw chords from, or None for random chords.
+        chords_per_page: Number of chords on each page.
+        dpi: Resolution the pages are rendered at.
+        fonts: Fonts to cycle through page by page (None is Pillow's default font).
+        seed: Seed making the corpus reproducible.
+
+    Returns:
+        Paths of the written images.
+
+    Raises:
+        ValueError: If a level name is unknown.
+        IOError: If a font cannot be loaded or a file cannot be written.
+    """
+    unknown = [level for level in levels if level not in DEGRADATION_LEVELS]
+    if unknown:
+        raise ValueError(
+            f"Unknown degradation level: {', '.join(unknown)}. "
+            f"Available levels: {', '.join(DEGRADATION_LEVELS)}"
+        )
+
+    rng = random.Random(seed)
+    written = []
+
+    try:
+        for level in levels:
+            (output_dir / level).mkdir(parents=True, exist_ok=True)
+
+        for page in range(pages):
+            if voicing_pool:
+                voicings = [rng.choice(voicing_pool) for _ in range(chords_per_page)]
+            else:
+                voicings = [random_voicing(rng) for _ in range(chords_per_page)]
+            text = render_tab_text(voicings)
+            clean_image = render_tab_image(text, dpi, fonts[page % len(fonts)])
+
+            for level in levels:
+                image = degrade_image(clean_image, DEGRADATION_LEVELS[level], rng)
+                img_path = output_dir / level / f"page_{page:04d}.png"
+                image.save(img_path, dpi=(dpi, dpi))
+                img_path.with_suffix(".txt").write_text(text)
+                written.append(img_path)
+    except OSError as e:
+        raise OSError(f"Failed to write corpus to {output_dir}: {e}") from e
+
+    return written
@@ -1,12 +1,14 @@
 # Utility script to parse the XML chord database packaged with Gnome Guitar
 # (http://gnome-chord.sourceforge.net/)
-# It extracts relevant info (chord names, fret positions) while leaving out the rest
+# It extracts relevant info (chord names, fret positions) while leaving out the rest,
+# or every field for the SQLite chord catalogue (see chord_catalogue.py)
 # Fret positions are always extracted from thickest to thinnest string
 # (EADGBE for standard E tuning)
 
 import pickle
 import sys
 import xml.etree.ElementTree as ET
+from dataclasses import dataclass
 from pathlib import Path
 
 # Type aliases for chord database
@@ -19,19 +21,45 @@ INPUT_DB_PATH = DATA_DIR / "mainDB.xml"
 OUTPUT_DB_PATH = DATA_DIR / "mainDB.pkl"
 
 
-def parse_xml_database(xml_path: Path = INPUT_DB_PATH) -> ChordDatabase:
-    """
-    Parse the XML chord database and extract chord information.
+@dataclass(frozen=True)
+class VoicingRecord:
+    """One fingering of a chord, strings from thickest to thinnest."""
 
-    Args:
-        xml_path: Path to the input XML database file.
+    tuning: tuple[str, ...]  # Open string notes, e.g. ('E', 'A', 'D', 'G', 'B', 'E')
+    frets: tuple[int | None, ...]  # None for a string that isn't played
+    fingers: tuple[int | None, ...]  # 0 for an open string, None if not given
+    priority: int  # 1 is the most common fingering, 0 means unranked
+    info: str
 
-    Returns:
-        ChordDatabase: List of [chord_name, fret_notation_string] pairs.
+    @property
+    def notation(self) -> str:
+        """Fret notation in the pickle database format, e.g. 'A 0 D 2 G 2 B 2 E 0 '."""
+        return ''.join(
+            f"{note} {fret} " for note, fret in zip(self.tuning, self.frets, strict=True)
+            if fret is not None
+        )
+
+
+@dataclass(frozen=True)
+class ChordRecord:
+    """A chord entry with every field kept from the XML database."""
+
+    name: str
+    chord_type: str
+    root: str
+    shape: str
+    aliases: tuple[str, ...]  # The <written> forms, e.g. ('Amaj', 'A')
+    voicings: tuple[VoicingRecord, ...]
+
+
+def _read_chords_root(xml_path: Path) -> ET.Element:
+    """
+    Read the XML database and return its validated root element.
 
     Raises:
         FileNotFoundError: If the XML file doesn't exist.
         IOError: If the XML file cannot be read or parsed.
+        ValueError: If the root element is not 'chords'.
     """
     if not xml_path.exists():
         raise FileNotFoundError(f"XML database not found: {xml_path}")
@@ -50,6 +78,35 @@ def parse_xml_database(xml_path: Path = INPUT_DB_PATH) -> ChordDatabase:
             f"Invalid XML structure: expected root element 'chords', got '{root.tag}'"
         )
 
+    return root
+
+
+def _optional_int(text: str | None) -> int | None:
+    """Convert an optional XML text value to an int."""
+    if not text or not text.strip():
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"Invalid XML structure: expected a number, got '{text}'") from None
+
+
+def parse_xml_database(xml_path: Path = INPUT_DB_PATH) -> ChordDatabase:
+    """
+    Parse the XML chord database and extract chord information.
+
+    Args:
+        xml_path: Path to the input XML database file.
+
+    Returns:
+        ChordDatabase: List of [chord_name, fret_notation_string] pairs.
+
+    Raises:
+        FileNotFoundError: If the XML file doesn't exist.
+        IOError: If the XML file cannot be read or parsed.
+    """
+    root = _read_chords_root(xml_path)
+
     # A list is used here since the database contains multiple fingerings for each chord
     chord_list = []
 
@@ -76,6 +133,54 @@ def parse_xml_database(xml_path: Path = INPUT_DB_PATH) -> ChordDatabase:
     return chord_list
 
 
+def parse_xml_catalogue(xml_path: Path = INPUT_DB_PATH) -> list[ChordRecord]:
+    """
+    Parse the XML chord database keeping type, root, shape, aliases and every voicing.
+
+    Args:
+        xml_path: Path to the input XML database file.
+
+    Returns:
+        List of ChordRecord, one per <chord> element in file order.
+
+    Raises:
+        FileNotFoundError: If the XML file doesn't exist.
+        IOError: If the XML file cannot be read or parsed.
+        ValueError: If the XML structure is invalid or has no chords.
+    """
+    root = _read_chords_root(xml_path)
+    records = []
+
+    for child in root:
+        if 'name' not in child.attrib:
+            raise ValueError("Invalid XML structure: chord element missing 'name' attribute")
+
+        voicings = []
+        for voicing in child.findall('voiceing'):
+            strings = voicing.findall('guitarString')
+            voicings.append(VoicingRecord(
+                tuning=tuple(g_str.findtext('tuned', '').strip() for g_str in strings),
+                frets=tuple(_optional_int(g_str.findtext('fretNo')) for g_str in strings),
+                fingers=tuple(_optional_int(g_str.findtext('finger')) for g_str in strings),
+                priority=_optional_int(voicing.findtext('priority')) or 0,
+                info=(voicing.findtext('info') or '').strip(),
+            ))
+
+        records.append(ChordRecord(
+            name=child.attrib['name'],
+            chord_type=(child.findtext('type') or '').strip(),
+            root=(child.findtext('root') or '').strip(),
+            shape=(child.findtext('shape') or '').strip(),
+            aliases=tuple(w.text.strip() for w in child.findall('written') if w.text),
+            voicings=tuple(voicings),
+        ))
+
+    if not records:
+        raise ValueError(f"No chord entries found in XML database: {xml_path}")
+
+    return records
+
+
 def save_pickle_database(chord_list: ChordDatabase, output_path: Path = OUTPUT_DB_PATH) -> None:
     """
     Save the chord list to a pickle file.
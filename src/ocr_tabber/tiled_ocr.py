@@ -0,0 +1,256 @@
+# OCR for very large, high-DPI tab scans
+# Finds the inked area on a reduced-resolution decode, then runs tesseract on
+# overlapping horizontal bands in parallel and stitches the words back together
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import fmean
+
+from PIL import Image
+
+from ocr_tabber.deadline import Deadline, OcrTimeoutError, record_timeout
+from ocr_tabber.ocr_tab import (
+    OcrWord,
+    build_tesseract_config,
+    run_tesseract_words,
+    validate_image_path,
+)
+
+# Type alias for the word-level OCR function: (image, tesseract_config, timeout) -> words
+WordRunner = Callable[[Image.Image, str, float | None], list[OcrWord]]
+
+# Bands span the full content width, since a tab line is a single long word
+# that must not be cut. The overlap must be at least twice the height of a
+# text line, so that every line lies wholly inside the band that keeps it.
+DEFAULT_TILE_HEIGHT = 2048
+DEFAULT_TILE_OVERLAP = 256
+DEFAULT_WORKERS = 4
+
+LOCATE_SCALE = 8  # Downscale factor of the decode used to find content
+INK_THRESHOLD = 128  # Gray levels below this count as ink
+CONTENT_MARGIN = 16  # Padding around the located content, in full-resolution pixels
+
+
+@dataclass(frozen=True)
+class Tile:
+    """A horizontal band of the page and the rows it is responsible for."""
+
+    top: int
+    bottom: int
+    core_top: int  # Words centred in [core_top, core_bottom) belong to this tile
+    core_bottom: int
+
+
+def locate_content(img_path: Path) -> tuple[int, int, int, int] | None:
+    """
+    Find the bounding box of the ink on a page without decoding it at full size.
+
+    JPEG images are decoded at reduced resolution with ``Image.draft``. Other
+    formats have no cheap reduced decode, so no box is returned for them.
+
+    Args:
+        img_path: Path to the image.
+
+    Returns:
+        (left, top, right, bottom) in full-resolution pixels, or None if the
+        whole page should be used.
+
+    Raises:
+        IOError: If the image cannot be read.
+    """
+    try:
+        with Image.open(img_path) as image:
+            full_width, full_height = image.size
+            image.draft("L", (full_width // LOCATE_SCALE, full_height // LOCATE_SCALE))
+            if image.size == (full_width, full_height):
+                return None
+            small = image.convert("L")
+    except Exception as e:
+        raise OSError(f"Failed to open image file: {img_path}") from e
+
+    bbox = small.point(lambda v: 255 if v < INK_THRESHOLD else 0).getbbox()
+    if bbox is None:
+        return None
+
+    scale_x = full_width / small.width
+    scale_y = full_height / small.height
+    left, top, right, bottom = bbox
+    return (
+        max(0, int(left * scale_x) - CONTENT_MARGIN),
+        max(0, int(top * scale_y) - CONTENT_MARGIN),
+        min(full_width, int(right * scale_x + scale_x) + CONTENT_MARGIN),
+        min(full_height, int(bottom * scale_y + scale_y) + CONTENT_MARGIN),
+    )
+
+
+def plan_tiles(top: int, bottom: int, tile_height: int, overlap: int) -> list[Tile]:
+    """
+    Split the rows [top, bottom) into overlapping bands.
+
+    Each overlap is split at its midpoint between the two bands sharing it.
+
+    Args:
+        top: First row of the content.
+        bottom: Row after the last row of the content.
+        tile_height: Height of each band.
+        overlap: Number of rows shared by neighbouring bands.
+
+    Returns:
+        The bands from top to bottom.
+
+    Raises:
+        ValueError: If the overlap doesn't fit in the tile height.
+    """
+    if not 0 <= overlap < tile_height:
+        raise ValueError(
+            f"Tile overlap ({overlap}) must be non-negative and smaller than the "
+            f"tile height ({tile_height})"
+        )
+
+    spans = []
+    start = top
+    while True:
+        end = min(start + tile_height, bottom)
+        spans.append((start, end))
+        if end >= bottom:
+            break
+        start = end - overlap
+
+    tiles = []
+    core_top = top
+    for i, (start, end) in enumerate(spans):
+        if i + 1 < len(spans):
+            core_bottom = (spans[i + 1][0] + end) // 2
+        else:
+            core_bottom = bottom
+        tiles.append(Tile(start, end, core_top, core_bottom))
+        core_top = core_bottom
+
+    return tiles
+
+
+def assemble_text(words: Sequence[OcrWord]) -> str:
+    """
+    Rebuild page text from word boxes in page coordinates.
+
+    Words whose vertical centres are within half a word height of a line's
+    centre are put on that line, and each line is read left to right.
+
+    Args:
+        words: Recognized words from all tiles.
+
+    Returns:
+        The page text, one line per text line.
+    """
+    lines: list[list[OcrWord]] = []
+    centres: list[list[float]] = []
+
+    for word in sorted(words, key=lambda w: w.top + w.height / 2):
+        centre = word.top + word.height / 2
+        if lines and abs(centre - fmean(centres[-1])) <= max(word.height, lines[-1][-1].height) / 2:
+            lines[-1].append(word)
+            centres[-1].append(centre)
+        else:
+            lines.append([word])
+            centres.append([centre])
+
+    return "\n".join(
+        " ".join(word.text for word in sorted(line, key=lambda w: w.left)) for line in lines
+    ) + ("\n" if lines else "")
+
+
+def ocr_tab_image_tiled(
+    image_path: str,
+    profile: str | None = None,
+    tile_height: int = DEFAULT_TILE_HEIGHT,
+    overlap: int = DEFAULT_TILE_OVERLAP,
+    workers: int = DEFAULT_WORKERS,
+    runner: WordRunner = run_tesseract_words,
+    timeout: float | None = None,
+    deadline: Deadline | None = None,
+) -> str:
+    """
+    Perform OCR on a large guitar tab image one band at a time.
+
+    The page is decoded once as 8-bit grayscale (directly from the JPEG
+    decoder where possible), and each worker crops its own band, so at most
+    ``workers`` bands are held by tesseract at a time. Words detected twice in
+    an overlap are kept only by the band whose core contains their centre.
+
+    Every band shares the image's time budget. When it runs out, running
+    tesseract processes are killed, bands not yet started are skipped, and
+    the text of the finished bands is attached to the OcrTimeoutError. The
+    image counts as one timeout in timeout_stats(), however many bands failed.
+
+    Args:
+        image_path: Path to the image file containing guitar tablature.
+        profile: Optional name of a tesseract config file (see ocr_tab_image).
+        tile_height: Height of each band in pixels.
+        overlap: Rows shared by neighbouring bands.
+        workers: Number of bands recognized in parallel.
+        runner: Word-level OCR function.
+        timeout: Seconds allowed for the whole image, or None for no limit.
+        deadline: Deadline of the job this image belongs to.
+
+    Returns:
+        The OCR result as a string.
+
+    Raises:
+        FileNotFoundError: If the image file or profile doesn't exist.
+        ValueError: If the file extension or tiling parameters are invalid.
+        IOError: If the image cannot be read.
+        OcrTimeoutError: If the image runs past its deadline.
+        RuntimeError: If OCR fails.
+    """
+    image_deadline = Deadline(timeout, parent=deadline)
+    img_path = validate_image_path(image_path)
+    config = build_tesseract_config(profile)
+
+    image_deadline.check("decode")
+    content_box = locate_content(img_path)
+
+    try:
+        with Image.open(img_path) as image:
+            image.draft("L", image.size)
+            page = image.convert("L")
+    except Exception as e:
+        raise OSError(f"Failed to open image file: {image_path}") from e
+
+    image_deadline.check("preprocessing")
+    left, top, right, bottom = content_box or (0, 0, page.width, page.height)
+    tiles = plan_tiles(top, bottom, tile_height, overlap)
+
+    def recognize_tile(tile: Tile) -> list[OcrWord]:
+        image_deadline.check("ocr", record=False)
+        band = page.crop((left, tile.top, right, tile.bottom))
+        words = []
+        for word in runner(band, config, image_deadline.remaining()):
+            placed = OcrWord(
+                word.text, word.left + left, word.top + tile.top, word.width, word.height, word.conf
+            )
+            if tile.core_top <= placed.top + placed.height / 2 < tile.core_bottom:
+                words.append(placed)
+        return words
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(recognize_tile, tile) for tile in tiles]
+        try:
+            words = [word for future in futures for word in future.result()]
+        except OcrTimeoutError as e:
+            for future in futures:
+                future.cancel()
+            # Bands fail together once the deadline passes; count the image once
+            record_timeout(e.stage)
+            finished = [
+                word
+                for future in futures
+                if future.done() and not future.cancelled() and future.exception() is None
+                for word in future.result()
+            ]
+            raise OcrTimeoutError(
+                f"Tiled OCR of {image_path} exceeded its deadline", e.stage, assemble_text(finished)
+            ) from e
+
+    return assemble_text(words)
@@ -0,0 +1,229 @@
+# Suggests the easiest way to play a sequence of recognized chords
+# Every voicing in the chord database gets a difficulty, and every pair of
+# voicings a transition cost, precomputed with NumPy when the database is
+# built. A Viterbi pass then picks one voicing per chord of a song so that
+# the summed cost is minimal.
+
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+
+from ocr_tabber.tab_db_extractor import ChordRecord
+
+# Get the data directory path relative to this module
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+VOICING_MATRIX_PATH = DATA_DIR / "mainDB.voicings.npz"
+
+MUTED = -1  # Fret value of a string that isn't played
+
+# Cost weights, in "frets of hand movement"
+MOVE_WEIGHT = 1.0  # Per fret the hand position shifts between voicings
+CHANGE_WEIGHT = 0.5  # Per string whose fret changes between voicings
+SPAN_WEIGHT = 1.0  # Per fret of stretch within a voicing
+PRIORITY_WEIGHT = 0.5  # Per rank below the most common fingering of a chord
+UNRANKED_PRIORITY = 3  # Rank assumed for voicings without a priority
+
+
+class VoicingMatrix:
+    """
+    Every voicing of the chord database with its precomputed costs.
+
+    The transition matrix is dense, so it takes 4 * V**2 bytes for V voicings
+    (about 1 MB for the bundled database). Read-only after construction, so
+    it can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        names: np.ndarray,
+        notations: np.ndarray,
+        frets: np.ndarray,
+        difficulty: np.ndarray,
+        transition: np.ndarray,
+    ):
+        """
+        Args:
+            names: Chord name of each voicing, shape (V,).
+            notations: Fret notation of each voicing in the pickle database format, shape (V,).
+            frets: Fret per string from thickest to thinnest, MUTED if not played, shape (V, 6).
+            difficulty: Cost of playing each voicing, shape (V,).
+            transition: Cost of moving from voicing i to voicing j, shape (V, V).
+
+        Raises:
+            ValueError: If the array shapes don't agree.
+        """
+        count = len(names)
+        if not (len(notations) == len(frets) == len(difficulty) == count
+                and transition.shape == (count, count)):
+            raise ValueError(f"Voicing matrix arrays don't match {count} voicings")
+
+        self.names = names
+        self.notations = notations
+        self.frets = frets
+        self.difficulty = difficulty
+        self.transition = transition
+
+        self._candidates: dict[str, np.ndarray] = {}
+        order = np.argsort(names, kind="stable")
+        unique_names, starts = np.unique(names[order], return_index=True)
+        for name, group in zip(unique_names.tolist(), np.split(order, starts[1:]), strict=True):
+            self._candidates[name] = group
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def candidates(self, name: str) -> np.ndarray:
+        """Return the indices of every voicing of a chord (empty if the chord is unknown)."""
+        return self._candidates.get(name, np.zeros(0, dtype=np.intp))
+
+    def save(self, output_path: Path = VOICING_MATRIX_PATH) -> None:
+        """
+        Save the matrix as an uncompressed .npz file, so loading is a plain read.
+
+        Raises:
+            IOError: If the file cannot be written.
+        """
+        try:
+            with open(output_path, "wb") as outfile:
+                np.savez(
+                    outfile,
+                    names=self.names,
+                    notations=self.notations,
+                    frets=self.frets,
+                    difficulty=self.difficulty,
+                    transition=self.transition,
+                )
+        except Exception as e:
+            raise OSError(f"Failed to write voicing matrix: {output_path}") from e
+
+    @classmethod
+    def load(cls, db_path: Path = VOICING_MATRIX_PATH) -> Self:
+        """
+        Load a matrix saved by save.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+            IOError: If the file cannot be read.
+            ValueError: If the arrays don't agree.
+        """
+        if not db_path.exists():
+            raise FileNotFoundError(
+                f"Voicing matrix not found: {db_path} (run 'ocr-tabber build-db' to create it)"
+            )
+
+        try:
+            with np.load(db_path, allow_pickle=False) as data:
+                arrays = {key: data[key] for key in ("names", "notations", "frets", "difficulty", "transition")}
+        except Exception as e:
+            raise OSError(f"Failed to read voicing matrix: {db_path}") from e
+
+        return cls(**arrays)
+
+
+def build_voicing_matrix(records: Sequence[ChordRecord]) -> VoicingMatrix:
+    """
+    Compute the difficulty of every voicing and the cost of every transition.
+
+    A voicing's hand position is its lowest fretted fret. Its difficulty is
+    its fret span plus a penalty for less common fingerings. Moving between
+    two voicings costs the shift in hand position plus the number of strings
+    whose fret changes; open-string voicings leave the hand where it was.
+
+    Args:
+        records: Chords from parse_xml_catalogue.
+
+    Returns:
+        The VoicingMatrix over every voicing of every chord.
+    """
+    voicings = [(chord.name, voicing) for chord in records for voicing in chord.voicings]
+
+    names = np.array([name for name, _ in voicings], dtype=str)
+    notations = np.array([voicing.notation for _, voicing in voicings], dtype=str)
+    frets = np.array(
+        [[MUTED if fret is None else fret for fret in voicing.frets] for _, voicing in voicings],
+        dtype=np.int8,
+    ).reshape(len(voicings), -1)
+    priority = np.array([voicing.priority or UNRANKED_PRIORITY for _, voicing in voicings], dtype=np.float32)
+
+    fretted = np.where(frets > 0, frets, np.nan).astype(np.float32)
+    has_fretted = (frets > 0).any(axis=1)
+    lowest = np.fmin.reduce(fretted, axis=1, initial=np.nan)
+    highest = np.fmax.reduce(fretted, axis=1, initial=np.nan)
+    span = np.where(has_fretted, highest - lowest, 0)
+    difficulty = (SPAN_WEIGHT * span + PRIORITY_WEIGHT * (priority - 1)).astype(np.float32)
+
+    movement = np.nan_to_num(np.abs(lowest[:, None] - lowest[None, :]), nan=0.0)
+    changed = np.zeros((len(voicings), len(voicings)), dtype=np.float32)
+    for string in range(frets.shape[1]):
+        changed += frets[:, None, string] != frets[None, :, string]
+    transition = (MOVE_WEIGHT * movement + CHANGE_WEIGHT * changed).astype(np.float32)
+
+    return VoicingMatrix(names, notations, frets, difficulty, transition)
+
+
+def sequence_cost(voicings: Sequence[int], matrix: VoicingMatrix) -> float:
+    """Return the total cost of playing the voicings (matrix indices) in order."""
+    indices = np.asarray(voicings, dtype=np.intp)
+    return float(
+        matrix.difficulty[indices].sum() + matrix.transition[indices[:-1], indices[1:]].sum()
+    )
+
+
+def optimize_voicings(chord_names: Sequence[str], matrix: VoicingMatrix) -> list[int | None]:
+    """
+    Choose the voicing of each chord that minimizes the cost of the whole song.
+
+    Runs in O(N * K**2) for N chords with at most K voicings each. The costs
+    of every step are gathered from the precomputed matrix in one go, so the
+    sequential Viterbi loop only does a K x K add and argmin per chord.
+
+    Args:
+        chord_names: Names of the recognized chords, in playing order.
+        matrix: Precomputed voicing costs.
+
+    Returns:
+        The matrix index of the chosen voicing of each chord, or None for a
+        chord with no voicings in the matrix (it is left out of the path).
+    """
+    steps = [(i, matrix.candidates(name)) for i, name in enumerate(chord_names)]
+    steps = [(i, candidates) for i, candidates in steps if len(candidates)]
+    chosen: list[int | None] = [None] * len(chord_names)
+    if not steps:
+        return chosen
+
+    # Pad every step to the same number of candidates; padding can never be chosen
+    width = max(len(candidates) for _, candidates in steps)
+    padded = np.zeros((len(steps), width), dtype=np.intp)
+    difficulty = np.full((len(steps), width), np.inf, dtype=np.float32)
+    for row, (_, candidates) in enumerate(steps):
+        padded[row, :len(candidates)] = candidates
+        difficulty[row, :len(candidates)] = matrix.difficulty[candidates]
+    transitions = matrix.transition[padded[:-1, :, None], padded[1:, None, :]]
+
+    cost = difficulty[0]
+    backpointers = np.zeros((len(steps), width), dtype=np.intp)
+    for row in range(1, len(steps)):
+        total = cost[:, None] + transitions[row - 1]
+        best = total.argmin(axis=0)
+        backpointers[row] = best
+        cost = total[best, np.arange(width)] + difficulty[row]
+
+    choice = int(cost.argmin())
+    for row in range(len(steps) - 1, -1, -1):
+        chosen[steps[row][0]] = int(padded[row, choice])
+        choice = int(backpointers[row, choice])
+    return chosen
+
+
+def format_suggestions(chord_names: Sequence[str], chosen: Sequence[int | None], matrix: VoicingMatrix) -> str:
+    """Format the voicing chosen for each chord, and the cost of the whole sequence, for output."""
+    lines = [
+        f"Suggested voicing - {name}: {matrix.notations[index].rstrip()}"
+        for name, index in zip(chord_names, chosen, strict=True)
+        if index is not None
+    ]
+    played = [index for index in chosen if index is not None]
+    lines.append(f"Total voice-leading cost - {sequence_cost(played, matrix):g}")
+    return "\n".join(lines)
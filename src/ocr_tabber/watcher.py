@@ -0,0 +1,371 @@
+# Watches a directory for new or changed tab images and processes them
+# Each image is OCRed and its chords recognized on a worker pool, with the
+# results written next to it. A manifest of content hashes lets restarts skip
+# images that were already processed.
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ocr_tabber.chord_recognizer import (
+    ChordDatabase,
+    ChordIndex,
+    format_chord_match,
+    parse_tab_table,
+    recognize_chords,
+)
+from ocr_tabber.deadline import OcrTimeoutError
+from ocr_tabber.ocr_tab import SUPPORTED_IMAGE_EXTENSIONS, ocr_tab_image
+
+# Type alias for the OCR function: image_path -> text
+PageOcr = Callable[[str], str]
+
+MANIFEST_NAME = ".ocr-tabber-manifest.json"
+TAB_SUFFIX = ".tab.txt"  # OCR output, next to the image
+CHORDS_SUFFIX = ".chords.txt"  # Recognized chords, next to the image
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_WATCH_WORKERS = 4
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o0004000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (name follows)
+
+
+def is_image(path: Path) -> bool:
+    """Return whether a file should be picked up by the watcher."""
+    return path.suffix.lower() in SUPPORTED_IMAGE_EXTENSIONS and not path.name.startswith('.')
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as infile:
+        for block in iter(lambda: infile.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ProcessedManifest:
+    """
+    Persistent record of the content hash each image was last processed with.
+
+    Safe to update from several worker threads. Every update is written to
+    disk atomically, so a crash never leaves a truncated manifest.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Load the manifest, starting empty if it doesn't exist yet.
+
+        Raises:
+            IOError: If the manifest exists but cannot be read.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] = {}
+
+        if path.exists():
+            try:
+                self._entries = dict(json.loads(path.read_text()))
+            except Exception as e:
+                raise OSError(f"Failed to read manifest: {path}") from e
+
+    def is_processed(self, name: str, digest: str) -> bool:
+        """Return whether the file was processed with exactly this content."""
+        with self._lock:
+            return self._entries.get(name) == digest
+
+    def record(self, name: str, digest: str) -> None:
+        """
+        Mark a file as processed and save the manifest.
+
+        Raises:
+            IOError: If the manifest cannot be written.
+        """
+        with self._lock:
+            self._entries[name] = digest
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                tmp_path.write_text(json.dumps(self._entries, indent=1, sort_keys=True))
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                raise OSError(f"Failed to write manifest: {self.path}") from e
+
+
+class InotifyWatcher:
+    """Reports images written or moved into a directory, using Linux inotify."""
+
+    def __init__(self, directory: Path):
+        """
+        Start watching the directory.
+
+        Raises:
+            OSError: If inotify is not available on this system.
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this system")
+
+        self.directory = directory
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"Failed to watch directory: {directory}")
+
+    def changes(self, timeout: float) -> list[Path]:
+        """Wait up to timeout seconds and return the images that were written."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_len = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            path = self.directory / os.fsdecode(name)
+            if name and is_image(path) and path not in paths:
+                paths.append(path)
+        return paths
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """
+    Reports new or changed images in a directory by comparing listings.
+
+    A file is reported once its size and modification time are the same on
+    two consecutive polls, so images still being written are not picked up.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._seen = self._snapshot()
+        self._pending: dict[Path, tuple[int, int]] = {}
+
+    def _snapshot(self) -> dict[Path, tuple[int, int]]:
+        """Return (mtime, size) for every image in the directory."""
+        snapshot = {}
+        for entry in os.scandir(self.directory):
+            path = Path(entry.path)
+            if entry.is_file() and is_image(path):
+                stat = entry.stat()
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self, timeout: float) -> list[Path]:
+        """Wait timeout seconds and return the images that changed and settled."""
+        time.sleep(timeout)
+        snapshot = self._snapshot()
+
+        changed = {path: sig for path, sig in snapshot.items() if self._seen.get(path) != sig}
+        settled = [path for path, sig in changed.items() if self._pending.get(path) == sig]
+        self._pending = {path: sig for path, sig in changed.items() if path not in settled}
+        for path in settled:
+            self._seen[path] = snapshot[path]
+        self._seen = {path: sig for path, sig in self._seen.items() if path in snapshot}
+
+        return sorted(settled)
+
+    def close(self) -> None:
+        """Stop watching."""
+
+
+def create_watcher(directory: Path, use_inotify: bool = True) -> InotifyWatcher | PollingWatcher:
+    """Return an inotify watcher where available, otherwise a polling one."""
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except OSError as e:
+            print(f"inotify unavailable ({e}), falling back to polling", file=sys.stderr)
+    return PollingWatcher(directory)
+
+
+def process_image(img_path: Path, chord_db: ChordDatabase | ChordIndex, ocr: PageOcr = ocr_tab_image) -> list[Path]:
+    """
+    OCR an image and recognize its chords, writing the results next to it.
+
+    The OCR text goes to ``<name>.tab.txt``. If it parses as a tab, the
+    recognized chords go to ``<name>.chords.txt``.
+
+    Args:
+        img_path: Path to the image.
+        chord_db: ChordDatabase loaded from pickle file, or a ChordIndex of it.
+        ocr: OCR function to use.
+
+    Returns:
+        Paths of the written result files.
+
+    Raises:
+        FileNotFoundError: If the image has disappeared.
+        ValueError: If the image format is not supported.
+        IOError: If the image cannot be read or results cannot be written.
+        RuntimeError: If OCR fails.
+    """
+    text = ocr(str(img_path))
+    tab_path = img_path.with_name(img_path.stem + TAB_SUFFIX)
+    written = [tab_path]
+
+    try:
+        tab_path.write_text(text)
+
+        try:
+            key, notes = parse_tab_table(text, f"OCR output of {img_path}")
+        except ValueError:
+            return written
+
+        matches = recognize_chords(key, notes, chord_db)
+        chords_path = img_path.with_name(img_path.stem + CHORDS_SUFFIX)
+        chords_path.write_text("".join(format_chord_match(m) + "\n" for m in matches))
+        written.append(chords_path)
+    except OSError as e:
+        raise OSError(f"Failed to write results for {img_path}: {e}") from e
+
+    return written
+
+
+def watch_directory(
+    directory: Path,
+    chord_db: ChordDatabase | ChordIndex,
+    ocr: PageOcr = ocr_tab_image,
+    workers: int = DEFAULT_WATCH_WORKERS,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    use_inotify: bool = True,
+    once: bool = False,
+    stop_event: threading.Event | None = None,
+) -> Counter[str]:
+    """
+    Process the images in a directory, then keep processing new or changed ones.
+
+    Images already in the manifest with the same content are skipped, so
+    restarting the watcher only processes what changed while it was down.
+    An image is never processed by two workers at once: if it changes while
+    being processed, it is processed again once the running job finishes.
+
+    Args:
+        directory: Directory to watch.
+        chord_db: ChordDatabase loaded from pickle file, or a ChordIndex of it.
+        ocr: OCR function to use.
+        workers: Number of images processed in parallel.
+        poll_interval: Seconds between checks for changes (and stop requests).
+        use_inotify: Use inotify where available instead of polling.
+        once: Process the images already present and return without watching.
+        stop_event: Event that stops the watcher when set. Images still
+            queued are dropped; images being processed are finished.
+
+    Returns:
+        Counter of 'processed', 'skipped', 'timed_out' and 'failed' images.
+
+    Raises:
+        FileNotFoundError: If the directory doesn't exist.
+        IOError: If the manifest cannot be read.
+    """
+    if not directory.is_dir():
+        raise FileNotFoundError(f"Watch directory not found: {directory}")
+
+    manifest = ProcessedManifest(directory / MANIFEST_NAME)
+    stats: Counter[str] = Counter()
+    stats_lock = threading.Lock()
+
+    # Images queued or being processed, and those that changed in the meantime
+    in_flight: set[Path] = set()
+    changed_again: set[Path] = set()
+    in_flight_lock = threading.Lock()
+
+    def handle(img_path: Path) -> None:
+        outcome = "failed"
+        try:
+            digest = file_digest(img_path)
+            if manifest.is_processed(img_path.name, digest):
+                outcome = "skipped"
+                return
+            process_image(img_path, chord_db, ocr)
+            manifest.record(img_path.name, digest)
+            outcome = "processed"
+            print(f"Processed {img_path}")
+        except OcrTimeoutError as e:
+            outcome = "timed_out"
+            print(f"Timed out processing {img_path}: {e}", file=sys.stderr)
+        except (FileNotFoundError, ValueError, OSError, RuntimeError) as e:
+            print(f"Error processing {img_path}: {e}", file=sys.stderr)
+        except Exception as e:
+            print(f"Unexpected error processing {img_path}: {type(e).__name__}: {e}", file=sys.stderr)
+        finally:
+            with stats_lock:
+                stats[outcome] += 1
+
+    def run(img_path: Path) -> None:
+        handle(img_path)
+        with in_flight_lock:
+            if img_path not in changed_again:
+                in_flight.discard(img_path)
+                return
+            changed_again.discard(img_path)
+        try:
+            executor.submit(run, img_path)
+        except RuntimeError:
+            # The watcher is shutting down
+            with in_flight_lock:
+                in_flight.discard(img_path)
+
+    def submit(img_path: Path) -> None:
+        with in_flight_lock:
+            if img_path in in_flight:
+                changed_again.add(img_path)
+                return
+            in_flight.add(img_path)
+        executor.submit(run, img_path)
+
+    # Start watching before the initial scan, so nothing written in between is missed
+    watcher = None if once else create_watcher(directory, use_inotify)
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        for img_path in sorted(directory.iterdir()):
+            if img_path.is_file() and is_image(img_path):
+                submit(img_path)
+
+        while watcher is not None and not (stop_event and stop_event.is_set()):
+            for img_path in watcher.changes(poll_interval):
+                submit(img_path)
+
+        # Stopped: drop the queued images; in once mode, process them all
+        executor.shutdown(cancel_futures=watcher is not None)
+    except BaseException:
+        # Interrupted: finish the running images but drop the queued ones
+        executor.shutdown(cancel_futures=True)
+        raise
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+    return stats
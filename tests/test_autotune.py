@@ -0,0 +1,131 @@
+"""Tests for the autotune module."""
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from ocr_tabber.autotune import (
+    OcrParams,
+    TuningResult,
+    autotune,
+    build_param_grid,
+    character_error_rate,
+    collect_labeled_corpus,
+    pareto_front,
+    select_profile,
+    write_profile,
+)
+
+
+def make_result(cer: float, seconds: float, psm: int = 6) -> TuningResult:
+    """Build a TuningResult for the given score."""
+    return TuningResult(OcrParams(psm=psm), cer, seconds)
+
+
+class TestCharacterErrorRate:
+    """Tests for character_error_rate function."""
+
+    @pytest.mark.parametrize(
+        ("reference", "hypothesis", "expected"),
+        [
+            ("e|-3-|", "e|-3-|", 0.0),
+            ("e|-3-|", "e|-8-|", 1 / 6),
+            ("e|-3-|", "e|-3|", 1 / 6),
+            ("e|-3-|  \n", "e|-3-|\n\n", 0.0),
+            ("", "", 0.0),
+        ],
+    )
+    def test_error_rate(self, reference: str, hypothesis: str, expected: float):
+        """Test CER on identical, substituted, deleted and whitespace-only differences."""
+        assert character_error_rate(reference, hypothesis) == pytest.approx(expected)
+
+
+class TestCollectLabeledCorpus:
+    """Tests for collect_labeled_corpus function."""
+
+    def test_pairs_images_with_ground_truth(self, temp_dir: Path, sample_tab_content: str):
+        """Test that only images with a matching .txt file are collected."""
+        (temp_dir / "sub").mkdir()
+        Image.new("L", (10, 10), 255).save(temp_dir / "sub" / "page1.png")
+        (temp_dir / "sub" / "page1.txt").write_text(sample_tab_content)
+        Image.new("L", (10, 10), 255).save(temp_dir / "unlabeled.png")
+
+        corpus = collect_labeled_corpus(temp_dir)
+
+        assert corpus == [(temp_dir / "sub" / "page1.png", sample_tab_content)]
+
+    def test_empty_corpus(self, temp_dir: Path):
+        """Test that ValueError is raised when nothing is labeled."""
+        with pytest.raises(ValueError, match="No labeled images found"):
+            collect_labeled_corpus(temp_dir)
+
+
+class TestParamGrid:
+    """Tests for OcrParams and build_param_grid."""
+
+    def test_grid_size(self):
+        """Test that the grid is the full product of the swept values."""
+        grid = build_param_grid([4, 6], [1])
+        assert len(grid) == 2 * 1 * 2 * 2
+        assert len(set(grid)) == len(grid)
+
+    def test_config_file_format(self):
+        """Test that the config file sets every swept parameter."""
+        content = OcrParams(psm=11, oem=1, load_system_dawg=False).to_config_file()
+        assert "tessedit_pageseg_mode 11\n" in content
+        assert "tessedit_ocr_engine_mode 1\n" in content
+        assert "load_system_dawg F\n" in content
+        assert "load_freq_dawg T\n" in content
+
+
+class TestParetoFront:
+    """Tests for pareto_front and select_profile functions."""
+
+    def test_dominated_results_removed(self):
+        """Test that only non-dominated results are kept, most accurate first."""
+        results = [
+            make_result(0.10, 5.0),
+            make_result(0.05, 8.0),
+            make_result(0.20, 6.0),  # dominated by (0.10, 5.0)
+            make_result(0.30, 1.0),
+        ]
+        front = pareto_front(results)
+        assert [(r.cer, r.seconds) for r in front] == [(0.05, 8.0), (0.10, 5.0), (0.30, 1.0)]
+
+    def test_select_with_error_budget(self):
+        """Test that max_cer picks the fastest configuration within budget."""
+        front = pareto_front([make_result(0.05, 8.0), make_result(0.10, 5.0)])
+        assert select_profile(front).cer == 0.05
+        assert select_profile(front, max_cer=0.12).seconds == 5.0
+        with pytest.raises(ValueError, match="No configuration reached"):
+            select_profile(front, max_cer=0.01)
+
+
+class TestAutotune:
+    """Tests for the autotune sweep."""
+
+    def test_sweep_skips_failing_configs(self, temp_dir: Path):
+        """Test that configurations tesseract rejects are left out of the results."""
+        img_path = temp_dir / "page.png"
+        Image.new("L", (10, 10), 255).save(img_path)
+        corpus = [(img_path, "e|-3-|")]
+
+        def fake_runner(image: Image.Image, config: str) -> str:
+            if "--oem 0" in config:
+                raise RuntimeError("engine not available")
+            return "e|-3-|" if "--psm 6" in config else "e|-8-|"
+
+        results = autotune(corpus, build_param_grid([4, 6], [0, 1], [True]), fake_runner)
+
+        assert {r.params.oem for r in results} == {1}
+        assert select_profile(pareto_front(results)).params.psm == 6
+
+    def test_write_profile(self, temp_dir: Path):
+        """Test writing a profile and rejecting path-like names."""
+        path = write_profile(make_result(0.1, 2.0, psm=4), "fast", temp_dir)
+        assert path == temp_dir / "fast"
+        assert "tessedit_pageseg_mode 4" in path.read_text()
+
+        with pytest.raises(ValueError, match="Invalid OCR profile name"):
+            write_profile(make_result(0.1, 2.0), "../fast", temp_dir)
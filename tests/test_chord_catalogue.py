@@ -0,0 +1,113 @@
+"""Tests for the chord_catalogue module."""
+
+from pathlib import Path
+
+import pytest
+
+from ocr_tabber.chord_catalogue import (
+    _SELECT_VOICINGS,
+    ChordCatalogue,
+    build_catalogue,
+    normalize_notation,
+)
+from ocr_tabber.tab_db_extractor import parse_xml_catalogue
+
+
+@pytest.fixture(scope="module")
+def catalogue_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Build a catalogue from the main XML database once for all tests."""
+    path = tmp_path_factory.mktemp("catalogue") / "chords.sqlite"
+    build_catalogue(parse_xml_catalogue(Path(__file__).parent.parent / "data" / "mainDB.xml"), path)
+    return path
+
+
+@pytest.fixture
+def catalogue(catalogue_path: Path):
+    """Open the shared catalogue."""
+    with ChordCatalogue(catalogue_path) as catalogue:
+        yield catalogue
+
+
+def query_plan(catalogue: ChordCatalogue, sql: str, params: list[str]) -> str:
+    """Return SQLite's query plan as a single string."""
+    rows = catalogue.connection.execute("EXPLAIN QUERY PLAN " + sql, params)
+    return "\n".join(row[-1] for row in rows)
+
+
+class TestLookups:
+    """Tests for the ChordCatalogue query API."""
+
+    def test_lookup_root_and_type(self, catalogue: ChordCatalogue):
+        """Test lookup by root and case-insensitive type."""
+        results = catalogue.lookup(root="A", chord_type="Minor")
+        assert results
+        assert {(r.name, r.root) for r in results} == {("A Minor", "A")}
+
+    def test_lookup_alias(self, catalogue: ChordCatalogue):
+        """Test lookup by a written alias."""
+        assert {r.name for r in catalogue.lookup_alias("Amaj")} == {"A Major"}
+
+    def test_lookup_fingering(self, catalogue: ChordCatalogue):
+        """Test lookup by fret notation as a user would type it."""
+        results = catalogue.lookup_fingering("A 0 D 2 G 2 B 1 E 0")
+        assert [r.name for r in results] == ["A Minor"]
+        assert results[0].frets == "x,0,2,2,1,0"
+
+    def test_voicings_ranked_by_priority(self, catalogue: ChordCatalogue):
+        """Test that ranked voicings come first and unranked (0) ones last."""
+        priorities = [r.priority for r in catalogue.voicings("A Major")]
+        assert priorities[0] == 1
+        ranked = [p for p in priorities if p]
+        assert ranked == sorted(ranked)
+        if 0 in priorities:
+            assert all(p == 0 for p in priorities[priorities.index(0):])
+
+    def test_lookup_requires_criteria(self, catalogue: ChordCatalogue):
+        """Test that an unfiltered lookup is rejected."""
+        with pytest.raises(ValueError, match="At least a root or a chord type"):
+            catalogue.lookup()
+
+    @pytest.mark.parametrize(
+        ("where", "params"),
+        [
+            ("WHERE c.root = ? AND c.type = ?", ["A", "minor"]),
+            ("WHERE c.type = ?", ["minor"]),
+            ("WHERE c.name = ?", ["A Minor"]),
+            ("WHERE c.id IN (SELECT chord_id FROM aliases WHERE alias = ?)", ["Am"]),
+            ("WHERE v.notation = ?", ["A 0 D 2 G 2 B 1 E 0 "]),
+        ],
+    )
+    def test_lookups_use_indexes(self, catalogue: ChordCatalogue, where: str, params: list[str]):
+        """Test that no lookup falls back to scanning a table."""
+        plan = query_plan(catalogue, _SELECT_VOICINGS + where, params)
+        assert "INDEX" in plan
+        assert "SCAN" not in plan
+
+
+class TestBuildCatalogue:
+    """Tests for building and opening catalogues."""
+
+    def test_missing_catalogue(self, temp_dir: Path):
+        """Test that FileNotFoundError points at build-db."""
+        with pytest.raises(FileNotFoundError, match="build-db --sqlite"):
+            ChordCatalogue(temp_dir / "missing.sqlite")
+
+    def test_not_a_catalogue(self, temp_dir: Path):
+        """Test that IOError is raised for files that aren't catalogues."""
+        path = temp_dir / "bogus.sqlite"
+        path.write_text("not a database")
+        with pytest.raises(IOError, match="Failed to read chord catalogue"):
+            ChordCatalogue(path)
+
+    def test_rebuild_replaces_file(self, temp_dir: Path, data_dir: Path):
+        """Test that building twice doesn't duplicate rows."""
+        path = temp_dir / "chords.sqlite"
+        records = parse_xml_catalogue(data_dir / "testDB.xml")
+        build_catalogue(records, path)
+        build_catalogue(records, path)
+        with ChordCatalogue(path) as catalogue:
+            assert len(catalogue.voicings("A Major")) == len(records[0].voicings)
+
+    def test_normalize_notation(self):
+        """Test that extra whitespace is normalized."""
+        assert normalize_notation("  A 0  D 2 ") == "A 0 D 2 "
@@ -6,9 +6,16 @@ import pytest
 
 from ocr_tabber.chord_recognizer import (
     ALLOWED_KEY,
+    ChordIndex,
+    group_chord_notes,
     load_chord_database,
+    lookup_chord,
     parse_tab_file,
+    parse_tab_table,
+    parse_tab_text,
+    recognize_chords,
 )
+from ocr_tabber.note_table import HAMMER_ON, MAX_FRET, PULL_OFF, SLIDE
 
 
 class TestLoadChordDatabase:
@@ -83,6 +90,115 @@ class TestParseTabFile:
         assert positions == sorted(positions)
 
 
+class TestParseTabText:
+    """Tests for parse_tab_text function."""
+
+    def test_matches_file_parsing(self, data_dir: Path):
+        """Test that parsing text gives the same result as parsing the file."""
+        tab_path = data_dir / "ASCIItab.txt"
+        assert parse_tab_text(tab_path.read_text()) == parse_tab_file(tab_path)
+
+    def test_source_in_error(self):
+        """Test that the error names where the text came from."""
+        with pytest.raises(ValueError, match="No valid tab lines found in OCR output"):
+            parse_tab_text("nothing here", "OCR output")
+
+    def test_too_many_strings(self):
+        """Test that the error for more than 6 strings reads well with the default source."""
+        with pytest.raises(ValueError, match=r"^7 strings found in tab text\. Only standard 6-string"):
+            parse_tab_text("e|-0-|\n" * 7)
+
+
+class TestParseTabTable:
+    """Tests for parse_tab_table function."""
+
+    def test_matches_list_parsing(self, sample_tab_content: str):
+        """Test that the table holds the same notes as the list representation."""
+        key, notes = parse_tab_table(sample_tab_content)
+        assert (key, notes.to_notes()) == parse_tab_text(sample_tab_content)
+
+    def test_oversized_fret(self, data_dir: Path):
+        """Test that OCR digit runs too large for a fret parse and match no chord."""
+        key, notes = parse_tab_table("e|--40000--|\nB|--40000--|\n")
+        assert notes.to_notes() == [[1, MAX_FRET, 3], [2, MAX_FRET, 3]]
+        assert recognize_chords(key, notes, load_chord_database(data_dir / "mainDB.pkl")) == []
+
+    def test_technique_flags(self):
+        """Test that a technique mark flags the note it leads into."""
+        _, notes = parse_tab_table("e|-5h-7-|\nB|-7p-5---3/-5-|\n")
+        assert notes.to_notes() == [[1, 7, 3], [2, 5, 3], [2, 5, 7]]
+        assert notes.flags.tolist() == [HAMMER_ON, PULL_OFF, SLIDE]
+
+    def test_technique_flags_within_token(self):
+        """Test that standard '5h7', '7p5' and '3/5' notation gives both notes."""
+        _, notes = parse_tab_table("e|-5h7-|\nB|-7p5---3/5-|\nG|-5h7p5-|\n")
+        assert notes.to_notes() == [
+            [1, 5, 2], [1, 7, 2], [2, 7, 2], [2, 5, 2], [3, 5, 2], [3, 7, 2], [3, 5, 2], [2, 3, 5], [2, 5, 5]
+        ]
+        assert notes.flags.tolist() == [0, HAMMER_ON, 0, PULL_OFF, 0, HAMMER_ON, PULL_OFF, 0, SLIDE]
+
+    def test_technique_token_is_not_a_chord(self):
+        """Test that the notes of a lone '5h7' are not grouped as a chord."""
+        _, notes = parse_tab_table("e|-----|\nB|-----|\nG|-5h7-|\n")
+        assert group_chord_notes(notes) == []
+
+    def test_technique_token_in_chord(self, data_dir: Path):
+        """Test that a chord column containing a '0h2' is recognized by its first notes."""
+        key, notes = parse_tab_table("e|-0---|\nB|-1---|\nG|-0h2-|\nD|-2---|\nA|-3---|\nE|-----|\n")
+        matches = recognize_chords(key, notes, load_chord_database(data_dir / "mainDB.pkl"))
+        assert [name for name, _ in matches] == ["C Major"]
+
+
+class TestRecognizeChords:
+    """Tests for recognize_chords function."""
+
+    def test_recognize_sample_tab(self, data_dir: Path):
+        """Test that chords in the sample tab are recognized in playing order."""
+        chord_db = load_chord_database(data_dir / "mainDB.pkl")
+        key, all_notes = parse_tab_file(data_dir / "ASCIItab.txt")
+
+        matches = recognize_chords(key, all_notes, chord_db)
+
+        assert [name for name, _ in matches] == ["Eb Major", "C Minor", "D Major"]
+        for name, fingerings in matches:
+            assert fingerings == [entry[1] for entry in chord_db if entry[0] == name]
+
+    def test_table_and_list_agree(self, data_dir: Path):
+        """Test that recognition gives the same result from a NoteTable and a list."""
+        chord_db = load_chord_database(data_dir / "mainDB.pkl")
+        text = (data_dir / "ASCIItab.txt").read_text()
+        key, table = parse_tab_table(text)
+        assert recognize_chords(key, table, chord_db) == recognize_chords(key, table.to_notes(), chord_db)
+
+
+class TestChordIndex:
+    """Tests for ChordIndex class."""
+
+    def test_matches_lookup_chord(self, data_dir: Path):
+        """Test that every notation in the database resolves as lookup_chord does."""
+        chord_db = load_chord_database(data_dir / "mainDB.pkl")
+        index = ChordIndex(chord_db)
+
+        for _, notation in chord_db:
+            assert index.lookup(notation) == lookup_chord(notation, chord_db)
+        assert index.lookup("E 99 ") is None
+
+    def test_results_are_copies(self, data_dir: Path):
+        """Test that changing a returned match doesn't change the shared index."""
+        index = ChordIndex.load(data_dir / "mainDB.pkl")
+        _, fingerings = index.lookup("A 0 D 2 G 2 B 1 E 0 ")
+        fingerings.clear()
+
+        assert index.lookup("A 0 D 2 G 2 B 1 E 0 ")[1]
+
+    def test_recognize_with_index(self, data_dir: Path):
+        """Test that recognize_chords gives the same matches with an index."""
+        chord_db = load_chord_database(data_dir / "mainDB.pkl")
+        key, notes = parse_tab_table((data_dir / "ASCIItab.txt").read_text())
+
+        assert recognize_chords(key, notes, ChordIndex(chord_db)) == recognize_chords(key, notes, chord_db)
+
+
 class TestAllowedKey:
     """Tests for the ALLOWED_KEY constant."""
 
@@ -0,0 +1,63 @@
+"""Tests for the deadline module."""
+
+import time
+
+import pytest
+
+from ocr_tabber.deadline import (
+    Deadline,
+    OcrTimeoutError,
+    record_timeout,
+    reset_timeout_stats,
+    timeout_stats,
+)
+
+
+class TestDeadline:
+    """Tests for the Deadline class."""
+
+    def test_unbounded(self):
+        """Test that a deadline without a limit never expires."""
+        deadline = Deadline()
+        assert deadline.remaining() is None
+        assert not deadline.expired()
+        deadline.check("ocr")
+
+    def test_expiry(self):
+        """Test that an expired deadline raises with the stage that was about to run."""
+        deadline = Deadline(0)
+        assert deadline.remaining() == 0.0
+        with pytest.raises(OcrTimeoutError, match="before decode") as excinfo:
+            deadline.check("decode")
+        assert excinfo.value.stage == "decode"
+        assert isinstance(excinfo.value, RuntimeError)
+
+    def test_child_bounded_by_parent(self):
+        """Test that a page deadline never outlives its job deadline."""
+        job = Deadline(0.5)
+        assert job.child(60).remaining() <= 0.5
+        assert job.child(None).remaining() <= 0.5
+        assert Deadline(60).child(0.1).remaining() <= 0.1
+
+    def test_remaining_decreases(self):
+        """Test that remaining time counts down."""
+        deadline = Deadline(10)
+        first = deadline.remaining()
+        time.sleep(0.01)
+        assert deadline.remaining() < first
+
+
+class TestTimeoutStats:
+    """Tests for the timeout counters."""
+
+    def test_counts_by_stage(self):
+        """Test that timeouts are counted per stage, including failed checks."""
+        reset_timeout_stats()
+        record_timeout("ocr")
+        record_timeout("ocr")
+        with pytest.raises(OcrTimeoutError):
+            Deadline(0).check("decode")
+
+        assert timeout_stats() == {"ocr": 2, "decode": 1}
+        reset_timeout_stats()
+        assert timeout_stats() == {}
@@ -0,0 +1,83 @@
+"""Tests for the note_table module."""
+
+import random
+
+import numpy as np
+import pytest
+
+from ocr_tabber.note_table import HAMMER_ON, MAX_FRET, NoteTable
+
+
+def reference_groups(all_notes: list[list[int]]) -> list[list[list[int]]]:
+    """Group consecutive notes sharing a column, as the original while loop did."""
+    groups = []
+    i = 0
+    while i < len(all_notes) - 1:
+        j = i
+        while j + 1 < len(all_notes) and all_notes[j + 1][2] == all_notes[i][2]:
+            j += 1
+        if j > i:
+            groups.append(all_notes[i:j + 1])
+        i = j + 1
+    return groups
+
+
+class TestNoteTable:
+    """Tests for the NoteTable class."""
+
+    def test_round_trip(self):
+        """Test conversion to and from note triplets."""
+        notes = [[1, 3, 2], [2, 12, 2], [6, 0, 7]]
+        table = NoteTable.from_notes(notes)
+        assert len(table) == 3
+        assert table.to_notes() == notes
+
+    def test_empty(self):
+        """Test that an empty table has no chords."""
+        table = NoteTable.from_notes([])
+        assert len(table) == 0
+        assert table.chord_groups() == []
+
+    def test_oversized_frets_clamped(self):
+        """Test that frets too large for the column are clamped instead of wrapping around."""
+        table = NoteTable.from_notes([[1, 40000, 3], [2, 10**20, 3], [3, 5, 3]])
+        assert table.fret.tolist() == [MAX_FRET, MAX_FRET, 5]
+        assert [group.tolist() for group in table.chord_groups()] == [[0, 1, 2]]
+
+    def test_mismatched_columns(self):
+        """Test that ValueError is raised for columns of different lengths."""
+        with pytest.raises(ValueError, match="same length"):
+            NoteTable([1, 2], [0], [1, 1])
+
+    def test_sort_is_stable(self):
+        """Test that notes in the same column keep their line order."""
+        table = NoteTable([1, 2, 3, 4], [0, 1, 2, 3], [5, 2, 5, 2]).sorted_by_column()
+        assert table.string.tolist() == [2, 4, 1, 3]
+
+    def test_chord_groups(self):
+        """Test that runs of two or more notes in a column are chords."""
+        table = NoteTable.from_notes([[1, 0, 2], [2, 1, 2], [1, 3, 6], [1, 5, 9], [3, 2, 9], [4, 2, 9]])
+        groups = [table.take(g).to_notes() for g in table.chord_groups()]
+        assert groups == [[[1, 0, 2], [2, 1, 2]], [[1, 5, 9], [3, 2, 9], [4, 2, 9]]]
+
+    def test_groups_match_reference(self):
+        """Test grouping against the original algorithm on random sorted notes."""
+        rng = random.Random(7)
+        for _ in range(50):
+            notes = sorted(
+                ([rng.randint(1, 6), rng.randint(0, 22), rng.randint(1, 30)] for _ in range(rng.randint(0, 40))),
+                key=lambda note: note[2],
+            )
+            table = NoteTable.from_notes(notes)
+            assert [table.take(g).to_notes() for g in table.chord_groups()] == reference_groups(notes)
+
+    def test_compact_storage(self):
+        """Test that each note takes a handful of bytes."""
+        table = NoteTable(np.ones(1000), np.ones(1000), np.arange(1000))
+        assert table.nbytes == 8 * 1000
+        assert table.flags.tolist() == [0] * 1000
+
+    def test_flags_kept_by_take(self):
+        """Test that technique flags follow their notes."""
+        table = NoteTable([1, 1], [5, 7], [3, 1], [0, HAMMER_ON]).sorted_by_column()
+        assert table.flags.tolist() == [HAMMER_ON, 0]
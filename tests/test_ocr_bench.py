@@ -0,0 +1,58 @@
+"""Tests for the ocr_bench module."""
+
+from pathlib import Path
+
+import pytest
+
+from ocr_tabber.deadline import OcrTimeoutError
+from ocr_tabber.ocr_bench import bench_corpus, format_report, percentile
+from ocr_tabber.synth_corpus import generate_corpus
+
+
+class TestPercentile:
+    """Tests for percentile function."""
+
+    @pytest.mark.parametrize(("q", "expected"), [(50, 5), (95, 10), (100, 10), (0, 1)])
+    def test_nearest_rank(self, q: float, expected: float):
+        """Test nearest-rank percentiles of 1..10."""
+        assert percentile(list(range(10, 0, -1)), q) == expected
+
+
+class TestBenchCorpus:
+    """Tests for bench_corpus function."""
+
+    def test_stats_per_level(self, temp_dir: Path):
+        """Test that results are grouped by degradation level with CER from ground truth."""
+        generate_corpus(temp_dir, pages=3, levels=["clean", "mild"], dpi=72)
+
+        def fake_ocr(image_path: str) -> str:
+            truth = Path(image_path).with_suffix(".txt").read_text()
+            return truth if "clean" in image_path else ""
+
+        stats = bench_corpus(temp_dir, fake_ocr)
+
+        assert [s.level for s in stats] == ["clean", "mild"]
+        assert all(s.pages == 3 for s in stats)
+        assert stats[0].cer == 0.0
+        assert stats[1].cer == 1.0
+        assert stats[0].p50 <= stats[0].p95
+
+        report = format_report(stats)
+        assert report.splitlines()[0].split() == [
+            "level", "pages", "pages/s", "p50", "ms", "p95", "ms", "CER", "timeouts"
+        ]
+        assert len(report.splitlines()) == 3
+
+    def test_timeouts_counted(self, temp_dir: Path):
+        """Test that timed-out pages are counted and scored on their partial result."""
+        generate_corpus(temp_dir, pages=2, levels=["clean"], dpi=72)
+
+        def slow_ocr(image_path: str) -> str:
+            truth = Path(image_path).with_suffix(".txt").read_text()
+            if image_path.endswith("page_0001.png"):
+                raise OcrTimeoutError("too slow", "ocr", partial_result=truth)
+            return truth
+
+        (stats,) = bench_corpus(temp_dir, slow_ocr)
+        assert stats.timeouts == 1
+        assert stats.cer == 0.0
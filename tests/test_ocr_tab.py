@@ -1,14 +1,31 @@
 """Tests for the ocr_tab module."""
 
+import time
 from pathlib import Path
 
+import pytesseract
 import pytest
+from PIL import Image
 
+from ocr_tabber import ocr_tab
+from ocr_tabber.autotune import OcrParams
+from ocr_tabber.deadline import Deadline, OcrTimeoutError, reset_timeout_stats, timeout_stats
 from ocr_tabber.ocr_tab import (
     SUPPORTED_IMAGE_EXTENSIONS,
+    build_tesseract_config,
+    ocr_tab_image,
     validate_image_path,
 )
 
+# Stand-in for the tesseract binary: hangs unless the dictionaries are disabled,
+# as they are in the fallback settings, in which case it answers straight away
+FAKE_TESSERACT = """#!/bin/sh
+case "$*" in
+    *load_system_dawg=0*) echo "e|-0-|" > "$2.txt" ;;
+    *) exec sleep 10 ;;
+esac
+"""
+
 
 class TestValidateImagePath:
     """Tests for validate_image_path function."""
@@ -57,3 +74,79 @@ class TestSupportedImageExtensions:
         for ext in SUPPORTED_IMAGE_EXTENSIONS:
             assert ext == ext.lower()
             assert ext.startswith('.')
+
+
+class TestBuildTesseractConfig:
+    """Tests for build_tesseract_config function."""
+
+    def test_default_config(self):
+        """Test that the built-in config sets page segmentation and the whitelist."""
+        config = build_tesseract_config()
+        assert "--psm 6" in config
+        assert "tessedit_char_whitelist=" in config
+
+    def test_profile_config(self):
+        """Test that a profile without modes leaves its settings to the named config file."""
+        config = build_tesseract_config("digits")
+        assert config.endswith(" digits")
+        assert "--psm" not in config
+
+    def test_profile_modes_on_command_line(self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch):
+        """Test that a profile's page segmentation and engine modes are passed as options."""
+        monkeypatch.setattr(ocr_tab, "TESSDATA_CONFIGS_DIR", temp_dir)
+        (temp_dir / "tuned").write_text(
+            "# Generated by ocr-tabber autotune\n" + OcrParams(psm=6, oem=1).to_config_file()
+        )
+
+        config = build_tesseract_config("tuned")
+        assert "--psm 6 " in config
+        assert "--oem 1 " in config
+        assert config.endswith(" tuned")
+
+    @pytest.mark.parametrize(
+        ("profile", "error"),
+        [("no-such-profile", FileNotFoundError), ("../digits", ValueError)],
+    )
+    def test_invalid_profile(self, profile: str, error: type[Exception]):
+        """Test that missing or path-like profile names are rejected."""
+        with pytest.raises(error):
+            build_tesseract_config(profile)
+
+
+class TestOcrDeadline:
+    """Tests for deadlines and the timeout fallback in ocr_tab_image."""
+
+    @pytest.fixture
+    def image_path(self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        """A small image, with tesseract replaced by FAKE_TESSERACT."""
+        fake = temp_dir / "tesseract"
+        fake.write_text(FAKE_TESSERACT)
+        fake.chmod(0o755)
+        monkeypatch.setattr(pytesseract.pytesseract, "tesseract_cmd", str(fake))
+        reset_timeout_stats()
+
+        path = temp_dir / "tab.png"
+        Image.new("L", (40, 20), 255).save(path)
+        return path
+
+    def test_fallback_after_timeout(self, image_path: Path):
+        """Test that a hung tesseract is killed and the fallback settings answer."""
+        start = time.monotonic()
+        result = ocr_tab_image(str(image_path), timeout=1.0)
+
+        assert result.strip() == "e|-0-|"
+        assert result.degraded
+        assert time.monotonic() - start < 2.0
+        assert timeout_stats() == {"ocr": 1, "degraded": 1}
+
+    def test_timeout_without_fallback(self, image_path: Path):
+        """Test that timeouts raise OcrTimeoutError when the fallback is disabled."""
+        with pytest.raises(OcrTimeoutError) as excinfo:
+            ocr_tab_image(str(image_path), timeout=0.3, fallback=False)
+        assert excinfo.value.stage == "ocr"
+        assert timeout_stats() == {"ocr": 1}
+
+    def test_expired_job_deadline(self, image_path: Path):
+        """Test that nothing runs once the job deadline has passed."""
+        with pytest.raises(OcrTimeoutError, match="before decode"):
+            ocr_tab_image(str(image_path), timeout=5.0, deadline=Deadline(0))
@@ -0,0 +1,243 @@
+"""Tests for the page_dedup module."""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from ocr_tabber.ocr_tab import OcrText
+from ocr_tabber.page_dedup import (
+    DedupingOcr,
+    PageHashIndex,
+    dhash,
+    hamming_distance,
+    hash_image_file,
+    phash,
+    settings_key,
+)
+from ocr_tabber.synth_corpus import render_tab_image, render_tab_text
+
+
+@pytest.fixture
+def pages(temp_dir: Path) -> dict[str, Path]:
+    """Two different tab pages, plus a rescaled JPEG copy of the first."""
+    first = render_tab_image(render_tab_text([[None, 3, 2, 0, 1, 0]] * 8), dpi=150)
+    second = render_tab_image(render_tab_text([[3, 5, 5, 4, 3, 3], [0, 2, 2, 1, 0, 0]] * 4), dpi=150)
+
+    paths = {
+        "first": temp_dir / "first.png",
+        "copy": temp_dir / "copy.jpg",
+        "second": temp_dir / "second.png",
+    }
+    first.save(paths["first"])
+    first.resize((first.width * 3 // 4, first.height * 3 // 4)).convert("L").save(paths["copy"], quality=50)
+    second.save(paths["second"])
+    return paths
+
+
+@pytest.fixture
+def fake_ocr():
+    """An OCR function that returns the image name and records its calls."""
+    calls = []
+
+    def ocr(image_path: str) -> str:
+        calls.append(image_path)
+        return Path(image_path).stem
+
+    ocr.calls = calls
+    return ocr
+
+
+class TestHashes:
+    """Tests for dhash and phash functions."""
+
+    @pytest.mark.parametrize("hash_function", [dhash, phash])
+    def test_hash_size(self, hash_function):
+        """Test that hashes have hash_size**2 bits."""
+        image = Image.new("L", (200, 100), 255)
+        assert len(hash_function(image, 8)) == 8
+        assert len(hash_function(image, 16)) == 32
+
+    @pytest.mark.parametrize("kind", ["dhash", "phash"])
+    def test_near_duplicates_closer_than_different_pages(self, pages: dict[str, Path], kind: str):
+        """Test that a recompressed copy hashes closer than a different page."""
+        first, copy, second = (hash_image_file(str(pages[name]), kind) for name in ("first", "copy", "second"))
+        assert hamming_distance(first, copy) < hamming_distance(first, second)
+
+    def test_unreadable_image(self, temp_dir: Path):
+        """Test that IOError is raised for files that aren't images."""
+        bad_path = temp_dir / "bad.png"
+        bad_path.write_text("not an image")
+        with pytest.raises(IOError, match="Failed to open image file"):
+            hash_image_file(str(bad_path))
+
+
+class TestPageHashIndex:
+    """Tests for PageHashIndex class."""
+
+    def test_lookup_threshold(self):
+        """Test that only hashes within the threshold match."""
+        index = PageHashIndex(hash_size=8)
+        index.add(bytes(8), "blank", 1.5)
+
+        assert index.lookup(bytes(7) + b"\x07", threshold=3) == ("blank", 1.5)
+        assert index.lookup(bytes(7) + b"\x0f", threshold=3) is None
+
+    def test_lookup_settings(self):
+        """Test that only entries with the same settings key match."""
+        index = PageHashIndex(hash_size=8)
+        index.add(bytes(8), "fast", 1.0, "profile=fast")
+        index.add(b"\x01" + bytes(7), "tabs", 1.0, "profile=tabs")
+
+        assert index.lookup(bytes(8), settings="profile=tabs") == ("tabs", 1.0)
+        assert index.lookup(bytes(8), settings="profile=None") is None
+
+    def test_lookup_returns_closest(self):
+        """Test that the closest stored page wins."""
+        index = PageHashIndex(hash_size=8)
+        index.add(b"\xff" * 8, "ones", 1.0)
+        index.add(bytes(8), "zeros", 2.0)
+        index.add(b"\xf0" * 8, "half", 3.0)
+
+        assert index.lookup(b"\xff" * 7 + b"\xf0", threshold=64) == ("ones", 1.0)
+
+    def test_empty_index(self):
+        """Test that lookups in an empty index find nothing."""
+        assert PageHashIndex().lookup(bytes(32)) is None
+
+    def test_lookup_and_save_do_not_wait_for_writers(self, temp_dir: Path):
+        """Test that lookups and saves read the current snapshot while an add is in progress."""
+        index = PageHashIndex(temp_dir / "index.json", hash_size=8)
+        index.add(bytes(8), "blank", 1.0)
+
+        with index._add_lock:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                assert executor.submit(index.lookup, bytes(8)).result(timeout=5) == ("blank", 1.0)
+                executor.submit(index.save).result(timeout=5)
+        assert len(PageHashIndex(temp_dir / "index.json", hash_size=8)) == 1
+
+    def test_persists_across_instances(self, temp_dir: Path):
+        """Test that saved entries survive a reload."""
+        index = PageHashIndex(temp_dir / "index.json")
+        index.add(b"\x01" * 32, "page text", 2.0)
+        index.save()
+
+        reloaded = PageHashIndex(temp_dir / "index.json")
+        assert len(reloaded) == 1
+        assert reloaded.lookup(b"\x01" * 32, threshold=0) == ("page text", 2.0)
+
+    def test_mismatched_settings(self, temp_dir: Path):
+        """Test that ValueError is raised for an index built with another hash."""
+        PageHashIndex(temp_dir / "index.json", kind="dhash").save()
+        with pytest.raises(ValueError, match="uses dhash"):
+            PageHashIndex(temp_dir / "index.json", kind="phash")
+
+    def test_unknown_hash(self):
+        """Test that ValueError is raised for unknown hash functions."""
+        with pytest.raises(ValueError, match="Unknown hash"):
+            PageHashIndex(kind="ahash")
+
+    def test_old_version(self, temp_dir: Path):
+        """Test that ValueError is raised for an index without OCR settings."""
+        (temp_dir / "index.json").write_text('{"version": 1, "kind": "phash", "hash_size": 16, "entries": []}')
+        with pytest.raises(ValueError, match="version 1"):
+            PageHashIndex(temp_dir / "index.json")
+
+    def test_corrupt_index(self, temp_dir: Path):
+        """Test that IOError is raised for unreadable index files."""
+        (temp_dir / "index.json").write_text("{not json")
+        with pytest.raises(IOError, match="Failed to read page hash index"):
+            PageHashIndex(temp_dir / "index.json")
+
+
+class TestDedupingOcr:
+    """Tests for DedupingOcr class."""
+
+    def test_reuses_near_duplicate(self, pages: dict[str, Path], fake_ocr, temp_dir: Path):
+        """Test that a near-duplicate page reuses the first page's OCR result."""
+        ocr = DedupingOcr(PageHashIndex(temp_dir / "index.json"), fake_ocr)
+
+        assert ocr(str(pages["first"])) == "first"
+        assert ocr(str(pages["copy"])) == "first"
+        assert ocr(str(pages["second"])) == "second"
+
+        assert fake_ocr.calls == [str(pages["first"]), str(pages["second"])]
+        assert (ocr.stats.hits, ocr.stats.misses) == (1, 2)
+        assert ocr.stats.seconds_saved >= 0
+        assert "1 of 3 pages" in ocr.stats.report()
+
+    def test_index_saved_for_next_run(self, pages: dict[str, Path], fake_ocr, temp_dir: Path):
+        """Test that a later run reuses results from an earlier one once it is closed."""
+        first_run = DedupingOcr(PageHashIndex(temp_dir / "index.json"), fake_ocr)
+        first_run(str(pages["first"]))
+        assert not (temp_dir / "index.json").exists()
+        first_run.close()
+
+        ocr = DedupingOcr(PageHashIndex(temp_dir / "index.json"), fake_ocr)
+        assert ocr(str(pages["copy"])) == "first"
+        assert len(fake_ocr.calls) == 1
+
+    def test_saves_in_batches(self, pages: dict[str, Path], fake_ocr, temp_dir: Path):
+        """Test that the index file is written once per save_every new pages."""
+        index = PageHashIndex(temp_dir / "index.json")
+        ocr = DedupingOcr(index, fake_ocr, save_every=2)
+
+        ocr(str(pages["first"]))
+        assert not (temp_dir / "index.json").exists()
+        ocr(str(pages["second"]))
+        assert len(PageHashIndex(temp_dir / "index.json")) == 2
+
+    def test_settings_not_mixed(self, pages: dict[str, Path], fake_ocr, temp_dir: Path):
+        """Test that pages recognized with other OCR settings are not reused."""
+        index = PageHashIndex(temp_dir / "index.json")
+        fast = DedupingOcr(index, fake_ocr, settings=settings_key(profile="fast"))
+        tabs = DedupingOcr(index, fake_ocr, settings=settings_key(profile="tabs"))
+
+        fast(str(pages["first"]))
+        tabs(str(pages["copy"]))
+        fast.close()
+
+        reloaded = DedupingOcr(PageHashIndex(temp_dir / "index.json"), fake_ocr, settings=settings_key(profile="tabs"))
+        assert tabs(str(pages["first"])) == "copy"
+        assert reloaded(str(pages["first"])) == "copy"
+        assert len(fake_ocr.calls) == 2
+
+    def test_zero_threshold_only_matches_identical(self, pages: dict[str, Path], fake_ocr):
+        """Test that a threshold of 0 disables near-duplicate reuse."""
+        ocr = DedupingOcr(PageHashIndex(), fake_ocr, threshold=0)
+        ocr(str(pages["first"]))
+        ocr(str(pages["first"]))
+        ocr(str(pages["copy"]))
+
+        assert (ocr.stats.hits, ocr.stats.misses) == (1, 2)
+
+    def test_ocr_errors_propagate(self, pages: dict[str, Path]):
+        """Test that failed pages are not added to the index."""
+        def failing_ocr(image_path: str) -> str:
+            raise RuntimeError("OCR processing failed")
+
+        index = PageHashIndex()
+        with pytest.raises(RuntimeError, match="OCR processing failed"):
+            DedupingOcr(index, failing_ocr)(str(pages["first"]))
+        assert len(index) == 0
+
+    def test_degraded_results_not_cached(self, pages: dict[str, Path], temp_dir: Path):
+        """Test that text from the timeout fallback is not reused for later copies."""
+        calls = []
+
+        def ocr(image_path: str) -> str:
+            calls.append(image_path)
+            return OcrText("fallback text", degraded=len(calls) == 1)
+
+        index = PageHashIndex(temp_dir / "index.json")
+        dedup = DedupingOcr(index, ocr)
+
+        assert dedup(str(pages["first"])) == "fallback text"
+        assert len(index) == 0
+        dedup(str(pages["copy"]))
+        dedup(str(pages["first"]))
+
+        assert len(calls) == 2
+        assert len(index) == 1
+        assert (dedup.stats.hits, dedup.stats.misses) == (1, 2)
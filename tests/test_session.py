@@ -0,0 +1,160 @@
+"""Tests for the session module."""
+
+import threading
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from ocr_tabber.chord_recognizer import ChordIndex
+from ocr_tabber.deadline import OcrTimeoutError
+from ocr_tabber.page_dedup import PageHashIndex
+from ocr_tabber.session import TabberSession
+
+
+@pytest.fixture(scope="module")
+def chord_index() -> ChordIndex:
+    """Index the main chord database once for all tests."""
+    return ChordIndex.load(Path(__file__).parent.parent / "data" / "mainDB.pkl")
+
+
+@pytest.fixture
+def tab_text(data_dir: Path) -> str:
+    """Return the sample ASCII tab."""
+    return (data_dir / "ASCIItab.txt").read_text()
+
+
+class TestRecognizeText:
+    """Tests for TabberSession.recognize_text method."""
+
+    def test_recognize_sample_tab(self, chord_index: ChordIndex, tab_text: str):
+        """Test that chords are returned in playing order, not printed."""
+        session = TabberSession(chord_index)
+        result = session.recognize_text(tab_text, "sample")
+
+        assert result.source == "sample"
+        assert result.key == ["E", "B", "G", "D", "A", "E"]
+        assert [name for name, _ in result.chords] == ["Eb Major", "C Minor", "D Major"]
+        assert session.stats() == {"texts": 1, "chords": 3}
+
+    def test_no_tab_lines(self, chord_index: ChordIndex):
+        """Test that ValueError is raised for text without tab lines."""
+        with pytest.raises(ValueError, match="No valid tab lines found in notes"):
+            TabberSession(chord_index).recognize_text("just words\n", "notes")
+
+    def test_load(self, data_dir: Path, tab_text: str):
+        """Test that a session can load its own chord database."""
+        session = TabberSession.load(data_dir / "mainDB.pkl", workers=2)
+        assert session.workers == 2
+        assert len(session.recognize_text(tab_text).chords) == 3
+
+    def test_load_nonexistent_database(self, temp_dir: Path):
+        """Test that FileNotFoundError is raised for missing databases."""
+        with pytest.raises(FileNotFoundError):
+            TabberSession.load(temp_dir / "missing.pkl")
+
+
+class TestRecognizeImage:
+    """Tests for TabberSession.recognize_image method."""
+
+    def test_uses_session_ocr(self, chord_index: ChordIndex, tab_text: str):
+        """Test that images go through the session's OCR function."""
+        calls = []
+
+        def ocr(image_path: str) -> str:
+            calls.append(image_path)
+            return tab_text
+
+        session = TabberSession(chord_index, ocr=ocr)
+        result = session.recognize_image(Path("page.png"))
+
+        assert calls == ["page.png"]
+        assert result.source == "page.png"
+        assert result.text == tab_text
+        assert len(result.chords) == 3
+
+    def test_timeout_counted(self, chord_index: ChordIndex):
+        """Test that OCR timeouts propagate and are counted."""
+        def ocr(image_path: str) -> str:
+            raise OcrTimeoutError("too slow", "ocr", "partial")
+
+        session = TabberSession(chord_index, ocr=ocr)
+        with pytest.raises(OcrTimeoutError):
+            session.recognize_image("page.png")
+        assert session.stats()["timed_out"] == 1
+
+    def test_dedup_index(self, chord_index: ChordIndex, tab_text: str, temp_dir: Path):
+        """Test that the same page is only OCRed once with a dedup index."""
+        Image.new("L", (64, 32), 255).save(temp_dir / "page.png")
+        calls = []
+
+        def ocr(image_path: str) -> str:
+            calls.append(image_path)
+            return tab_text
+
+        session = TabberSession(chord_index, ocr=ocr, dedup_index=PageHashIndex(temp_dir / "index.json"))
+        session.recognize_image(temp_dir / "page.png")
+        session.recognize_image(temp_dir / "page.png")
+
+        assert len(calls) == 1
+        assert session.ocr.stats.hits == 1
+
+        session.close()
+        assert len(PageHashIndex(temp_dir / "index.json")) == 1
+
+
+class TestBatches:
+    """Tests for the batch methods."""
+
+    def test_recognize_texts_in_order(self, chord_index: ChordIndex, tab_text: str):
+        """Test that batch results keep the input order."""
+        single = "e|-0-|\nB|-1-|\nG|-0-|\nD|-2-|\nA|-3-|\nE|---|\n"
+        session = TabberSession(chord_index, workers=4)
+
+        results = session.recognize_texts([tab_text, single, tab_text])
+
+        assert [len(result.chords) for result in results] == [3, 1, 3]
+        assert [result.source for result in results] == ["tab text 0", "tab text 1", "tab text 2"]
+        assert session.stats()["texts"] == 3
+
+    def test_stats_kept_across_batches(self, chord_index: ChordIndex, tab_text: str):
+        """Test that counts from the worker threads of finished batches are kept."""
+        session = TabberSession(chord_index, workers=2)
+        for _ in range(3):
+            session.recognize_texts([tab_text, tab_text])
+
+        assert session.stats() == {"texts": 6, "chords": 18}
+
+    def test_recognize_images_error(self, chord_index: ChordIndex, tab_text: str):
+        """Test that the first failing image raises."""
+        def ocr(image_path: str) -> str:
+            if image_path == "bad.png":
+                raise RuntimeError("OCR processing failed")
+            return tab_text
+
+        session = TabberSession(chord_index, ocr=ocr, workers=1)
+        with pytest.raises(RuntimeError, match="OCR processing failed"):
+            session.recognize_images(["good.png", "bad.png", "good.png"])
+
+    def test_shared_across_threads(self, chord_index: ChordIndex, tab_text: str):
+        """Test that concurrent callers of one session all get the same results."""
+        session = TabberSession(chord_index)
+        expected = session.recognize_text(tab_text).chords
+        results = []
+        results_lock = threading.Lock()
+
+        def call() -> None:
+            for _ in range(50):
+                chords = session.recognize_text(tab_text).chords
+                with results_lock:
+                    results.append(chords)
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 400
+        assert all(chords == expected for chords in results)
+        assert session.stats()["texts"] == 401
@@ -0,0 +1,107 @@
+"""Tests for the synth_corpus module."""
+
+import random
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from ocr_tabber.synth_corpus import (
+    DEGRADATION_LEVELS,
+    Degradation,
+    degrade_image,
+    generate_corpus,
+    load_voicings,
+    render_tab_image,
+    render_tab_text,
+)
+
+
+class TestLoadVoicings:
+    """Tests for load_voicings function."""
+
+    def test_load_test_database(self, data_dir: Path):
+        """Test that every voicing has one entry per string."""
+        voicings = load_voicings(data_dir / "testDB.xml")
+        assert len(voicings) > 0
+        assert voicings[0] == [None, 0, 2, 2, 2, 0]  # A Major, open shape
+
+    def test_load_nonexistent_file(self, temp_dir: Path):
+        """Test that FileNotFoundError is raised for missing files."""
+        with pytest.raises(FileNotFoundError, match="XML database not found"):
+            load_voicings(temp_dir / "nonexistent.xml")
+
+
+class TestRenderTabText:
+    """Tests for render_tab_text function."""
+
+    def test_render_single_system(self):
+        """Test that voicings are written thinnest string first with aligned columns."""
+        text = render_tab_text([[None, 0, 2, 2, 2, 0], [None, 3, 2, 0, 1, 0]])
+        assert text == (
+            "e|-0---0-|\n"
+            "B|-2---1-|\n"
+            "G|-2---0-|\n"
+            "D|-2---2-|\n"
+            "A|-0---3-|\n"
+            "E|-------|\n"
+        )
+
+    def test_two_digit_frets_padded(self):
+        """Test that columns with two-digit frets keep all lines the same length."""
+        text = render_tab_text([[None, None, 10, 9, 10, None]])
+        assert len({len(line) for line in text.splitlines()}) == 1
+
+    def test_multiple_systems(self):
+        """Test that chords are split into six-line systems."""
+        text = render_tab_text([[0, 2, 2, 1, 0, 0]] * 3, chords_per_system=2)
+        assert text.count("e|") == 2
+        assert "\n\n" in text
+
+
+class TestRenderAndDegrade:
+    """Tests for render_tab_image and degrade_image functions."""
+
+    def test_render_scales_with_dpi(self):
+        """Test that doubling the DPI roughly doubles the image size."""
+        text = render_tab_text([[0, 2, 2, 1, 0, 0]])
+        small = render_tab_image(text, dpi=100)
+        large = render_tab_image(text, dpi=200)
+        assert small.mode == "L"
+        assert large.width == pytest.approx(2 * small.width, rel=0.1)
+
+    def test_degrade_is_reproducible(self):
+        """Test that the same seed gives the same degraded image."""
+        image = Image.new("L", (50, 40), 255)
+        degradation = Degradation(skew_degrees=2.0, blur_radius=1.0, noise=0.1)
+        first = degrade_image(image, degradation, random.Random(1))
+        second = degrade_image(image, degradation, random.Random(1))
+        assert first.tobytes() == second.tobytes()
+        assert first.size != image.size  # rotation expands the canvas
+        assert image.getextrema() == (255, 255)  # input untouched
+
+
+class TestGenerateCorpus:
+    """Tests for generate_corpus function."""
+
+    def test_generate_layout(self, temp_dir: Path):
+        """Test that every level gets the same ground truth."""
+        written = generate_corpus(temp_dir, pages=2, levels=["clean", "heavy"], dpi=72)
+
+        assert len(written) == 4
+        for img_path in written:
+            assert img_path.with_suffix(".txt").exists()
+        assert (temp_dir / "clean" / "page_0001.txt").read_text() == (
+            temp_dir / "heavy" / "page_0001.txt"
+        ).read_text()
+
+    def test_unknown_level(self, temp_dir: Path):
+        """Test that ValueError is raised for unknown degradation levels."""
+        with pytest.raises(ValueError, match="Unknown degradation level"):
+            generate_corpus(temp_dir, pages=1, levels=["blurry"])
+
+    def test_levels_ordered_by_severity(self):
+        """Test that the named levels get progressively worse."""
+        levels = list(DEGRADATION_LEVELS.values())
+        for milder, harsher in zip(levels, levels[1:], strict=False):
+            assert harsher.noise > milder.noise
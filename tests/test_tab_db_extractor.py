@@ -5,7 +5,11 @@ from pathlib import Path
 
 import pytest
 
-from ocr_tabber.tab_db_extractor import parse_xml_database, save_pickle_database
+from ocr_tabber.tab_db_extractor import (
+    parse_xml_catalogue,
+    parse_xml_database,
+    save_pickle_database,
+)
 
 
 class TestParseXmlDatabase:
@@ -86,3 +90,43 @@ class TestSavePickleDatabase:
 
         with pytest.raises(IOError, match="Failed to write pickle database"):
             save_pickle_database(chord_list, invalid_path)
+
+
+class TestParseXmlCatalogue:
+    """Tests for parse_xml_catalogue function."""
+
+    def test_parse_all_fields(self, data_dir: Path):
+        """Test that type, root, shape, aliases and voicings are kept."""
+        records = parse_xml_catalogue(data_dir / "testDB.xml")
+        a_major = records[0]
+
+        assert a_major.name == "A Major"
+        assert a_major.chord_type == "major"
+        assert a_major.root == "A"
+        assert a_major.shape == "Open"
+        assert a_major.aliases == ("Amaj", "A")
+
+        voicing = a_major.voicings[0]
+        assert voicing.priority == 1
+        assert voicing.frets == (None, 0, 2, 2, 2, 0)
+        assert voicing.fingers == (None, 0, 1, 2, 3, 0)
+        assert voicing.notation == "A 0 D 2 G 2 B 2 E 0 "
+
+    def test_one_notation_per_voicing(self, data_dir: Path):
+        """Test that each voicing's notation matches the pickle format for single-voicing chords."""
+        records = parse_xml_catalogue(data_dir / "mainDB.xml")
+        pickle_db = parse_xml_database(data_dir / "mainDB.xml")
+        for record, (name, frets) in zip(records, pickle_db, strict=True):
+            assert record.name == name
+            assert "".join(v.notation for v in record.voicings) == frets
+
+    def test_parse_invalid_number(self, temp_dir: Path):
+        """Test that ValueError is raised for non-numeric fret numbers."""
+        bad = temp_dir / "bad.xml"
+        bad.write_text(
+            '<?xml version="1.0"?><chords><chord name="X"><voiceing>'
+            '<guitarString><tuned>E</tuned><fretted/><fretNo>x</fretNo></guitarString>'
+            '</voiceing></chord></chords>'
+        )
+        with pytest.raises(ValueError, match="expected a number"):
+            parse_xml_catalogue(bad)
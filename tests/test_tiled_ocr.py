@@ -0,0 +1,148 @@
+"""Tests for the tiled_ocr module."""
+
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw
+
+from ocr_tabber.deadline import OcrTimeoutError, reset_timeout_stats, timeout_stats
+from ocr_tabber.ocr_tab import OcrWord
+from ocr_tabber.tiled_ocr import (
+    assemble_text,
+    locate_content,
+    ocr_tab_image_tiled,
+    plan_tiles,
+)
+
+
+class TestPlanTiles:
+    """Tests for plan_tiles function."""
+
+    def test_single_tile(self):
+        """Test that short content gets one tile owning every row."""
+        tiles = plan_tiles(10, 100, 200, 20)
+        assert len(tiles) == 1
+        assert (tiles[0].core_top, tiles[0].core_bottom) == (10, 100)
+
+    def test_cores_partition_content(self):
+        """Test that tiles overlap while their cores cover the rows exactly once."""
+        tiles = plan_tiles(0, 1000, 300, 60)
+
+        assert tiles[0].top == 0
+        assert tiles[-1].bottom == 1000
+        for prev, curr in zip(tiles, tiles[1:], strict=False):
+            assert curr.top == prev.bottom - 60
+            assert prev.core_bottom == curr.core_top
+            assert curr.top <= curr.core_top < prev.bottom
+        assert tiles[0].core_top == 0
+        assert tiles[-1].core_bottom == 1000
+
+    def test_invalid_overlap(self):
+        """Test that ValueError is raised when the overlap doesn't fit."""
+        with pytest.raises(ValueError, match="Tile overlap"):
+            plan_tiles(0, 1000, 100, 100)
+
+
+class TestAssembleText:
+    """Tests for assemble_text function."""
+
+    def test_lines_ordered(self):
+        """Test that words are grouped into lines and read left to right."""
+        words = [
+            OcrWord("B|-1-|", 10, 52, 60, 20, 90.0),
+            OcrWord("x", 100, 48, 10, 20, 90.0),
+            OcrWord("e|-0-|", 10, 10, 60, 20, 90.0),
+        ]
+        assert assemble_text(words) == "e|-0-|\nB|-1-| x\n"
+
+    def test_empty(self):
+        """Test that no words gives empty text."""
+        assert assemble_text([]) == ""
+
+
+class TestTiledOcr:
+    """Tests for locate_content and ocr_tab_image_tiled functions."""
+
+    @pytest.fixture
+    def page_path(self, temp_dir: Path) -> Path:
+        """A white JPEG page with two black bars standing in for text lines."""
+        image = Image.new("RGB", (800, 1600), "white")
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((200, 400, 600, 430), fill="black")
+        draw.rectangle((200, 1000, 600, 1030), fill="black")
+        path = temp_dir / "page.jpg"
+        image.save(path)
+        return path
+
+    def test_locate_content_jpeg(self, page_path: Path):
+        """Test that content is found from a reduced decode of a JPEG."""
+        left, top, right, bottom = locate_content(page_path)
+        assert left <= 200 and right >= 600
+        assert top <= 400 and bottom >= 1030
+        assert top > 300 and bottom < 1150
+
+    def test_locate_content_png(self, temp_dir: Path):
+        """Test that formats without reduced decoding use the whole page."""
+        path = temp_dir / "page.png"
+        Image.new("L", (100, 100), 0).save(path)
+        assert locate_content(path) is None
+
+    def test_overlap_duplicates_removed(self, page_path: Path):
+        """Test that a line seen by two tiles is reported once."""
+        seen_tiles = []
+
+        def fake_runner(band: Image.Image, config: str, timeout: float | None) -> list[OcrWord]:
+            # Report a word for each dark bar in the band, in band coordinates
+            seen_tiles.append(band.size)
+            column = [band.getpixel((band.width // 2, y)) for y in range(band.height)]
+            return [
+                OcrWord("e|-0-|", 0, y, 100, 30, 95.0)
+                for y in range(band.height)
+                if column[y] < 128 and (y == 0 or column[y - 1] >= 128)
+            ]
+
+        text = ocr_tab_image_tiled(
+            str(page_path), tile_height=300, overlap=150, workers=2, runner=fake_runner
+        )
+
+        assert len(seen_tiles) > 2
+        assert all(height <= 300 for _, height in seen_tiles)
+        assert text == "e|-0-|\ne|-0-|\n"
+
+    def test_timeout_keeps_finished_tiles(self, page_path: Path):
+        """Test that a timeout reports the text of the tiles that finished."""
+
+        calls = []
+
+        def slow_runner(band: Image.Image, config: str, timeout: float | None) -> list[OcrWord]:
+            # Only the first tile finishes in time
+            calls.append(timeout)
+            if len(calls) > 1:
+                raise OcrTimeoutError("Tesseract exceeded its deadline and was killed", "ocr")
+            return [OcrWord("e|-0-|", 0, band.height // 2 - 15, 100, 30, 95.0)]
+
+        with pytest.raises(OcrTimeoutError) as excinfo:
+            ocr_tab_image_tiled(
+                str(page_path), tile_height=300, overlap=150, workers=1, runner=slow_runner, timeout=5
+            )
+
+        assert excinfo.value.stage == "ocr"
+        assert excinfo.value.partial_result == "e|-0-|\n"
+        assert 0 < calls[0] <= 5
+
+    def test_timeout_counted_once(self, page_path: Path):
+        """Test that an image whose bands all run out of time counts as one timeout."""
+        reset_timeout_stats()
+
+        def hung_runner(band: Image.Image, config: str, timeout: float | None) -> list[OcrWord]:
+            # Like tesseract being killed when its share of the budget runs out
+            time.sleep(timeout)
+            raise OcrTimeoutError("Tesseract exceeded its deadline and was killed", "ocr")
+
+        with pytest.raises(OcrTimeoutError):
+            ocr_tab_image_tiled(
+                str(page_path), tile_height=150, overlap=50, workers=4, runner=hung_runner, timeout=0.2
+            )
+
+        assert timeout_stats() == {"ocr": 1}
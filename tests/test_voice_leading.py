@@ -0,0 +1,130 @@
+"""Tests for the voice_leading module."""
+
+import itertools
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ocr_tabber.tab_db_extractor import ChordRecord, VoicingRecord, parse_xml_catalogue
+from ocr_tabber.voice_leading import (
+    MUTED,
+    VoicingMatrix,
+    build_voicing_matrix,
+    format_suggestions,
+    optimize_voicings,
+    sequence_cost,
+)
+
+STANDARD = ("E", "A", "D", "G", "B", "E")
+
+
+def chord(name: str, *voicings: tuple[tuple[int | None, ...], int]) -> ChordRecord:
+    """Build a chord record from (frets, priority) pairs."""
+    return ChordRecord(
+        name=name,
+        chord_type="major",
+        root=name[0],
+        shape="Open",
+        aliases=(),
+        voicings=tuple(
+            VoicingRecord(STANDARD, frets, (None,) * 6, priority, "") for frets, priority in voicings
+        ),
+    )
+
+
+@pytest.fixture
+def small_matrix() -> VoicingMatrix:
+    """Two chords with an open voicing and a barre voicing each."""
+    return build_voicing_matrix([
+        chord("A Major", ((None, 0, 2, 2, 2, 0), 1), ((5, 7, 7, 6, 5, 5), 2)),
+        chord("D Major", ((None, None, 0, 2, 3, 2), 1), ((None, 5, 7, 7, 7, 5), 0)),
+    ])
+
+
+@pytest.fixture(scope="module")
+def main_matrix() -> VoicingMatrix:
+    """Build the matrix for the main XML database once for all tests."""
+    return build_voicing_matrix(parse_xml_catalogue(Path(__file__).parent.parent / "data" / "mainDB.xml"))
+
+
+class TestBuildVoicingMatrix:
+    """Tests for build_voicing_matrix function."""
+
+    def test_frets_and_notations(self, small_matrix: VoicingMatrix):
+        """Test that voicings keep their frets and pickle notation."""
+        assert len(small_matrix) == 4
+        assert small_matrix.frets[0].tolist() == [MUTED, 0, 2, 2, 2, 0]
+        assert small_matrix.notations[0] == "A 0 D 2 G 2 B 2 E 0 "
+
+    def test_difficulty(self, small_matrix: VoicingMatrix):
+        """Test that difficulty grows with fret span and lower priority."""
+        # Span 0, most common; span 2, second; span 1, most common; span 2, unranked
+        assert small_matrix.difficulty.tolist() == [0.0, 2.5, 1.0, 3.0]
+
+    def test_transition(self, small_matrix: VoicingMatrix):
+        """Test that transitions cost hand movement plus changed strings."""
+        transition = small_matrix.transition
+        assert np.allclose(transition, transition.T)
+        assert np.all(np.diag(transition) == 0)
+        # Open A to open D: same hand position, four strings change
+        assert transition[0, 2] == 2.0
+        # Open A (fret 2) to barre A (fret 5): three frets, six strings change
+        assert transition[0, 1] == 6.0
+
+    def test_save_and_load(self, small_matrix: VoicingMatrix, temp_dir: Path):
+        """Test that a saved matrix loads back unchanged."""
+        small_matrix.save(temp_dir / "voicings.npz")
+        loaded = VoicingMatrix.load(temp_dir / "voicings.npz")
+
+        assert loaded.names.tolist() == small_matrix.names.tolist()
+        assert np.array_equal(loaded.transition, small_matrix.transition)
+        assert loaded.candidates("D Major").tolist() == [2, 3]
+
+    def test_load_nonexistent_file(self, temp_dir: Path):
+        """Test that FileNotFoundError is raised for missing matrices."""
+        with pytest.raises(FileNotFoundError, match="build-db"):
+            VoicingMatrix.load(temp_dir / "missing.npz")
+
+    def test_load_corrupt_file(self, temp_dir: Path):
+        """Test that IOError is raised for unreadable matrices."""
+        (temp_dir / "voicings.npz").write_text("not an npz")
+        with pytest.raises(IOError, match="Failed to read voicing matrix"):
+            VoicingMatrix.load(temp_dir / "voicings.npz")
+
+
+class TestOptimizeVoicings:
+    """Tests for optimize_voicings function."""
+
+    def test_prefers_easy_voicings(self, small_matrix: VoicingMatrix):
+        """Test that open chords are chosen when nothing favours the barres."""
+        assert optimize_voicings(["A Major", "D Major", "A Major"], small_matrix) == [0, 2, 0]
+
+    def test_unknown_chords_skipped(self, small_matrix: VoicingMatrix):
+        """Test that chords without voicings get None and don't break the path."""
+        assert optimize_voicings(["A Major", "H Major", "D Major"], small_matrix) == [0, None, 2]
+        assert optimize_voicings(["H Major"], small_matrix) == [None]
+        assert optimize_voicings([], small_matrix) == []
+
+    def test_matches_exhaustive_search(self, main_matrix: VoicingMatrix):
+        """Test that the Viterbi path is as cheap as the best of every possible sequence."""
+        rng = np.random.default_rng(7)
+        names = sorted(set(main_matrix.names.tolist()))
+
+        for _ in range(20):
+            song = [str(name) for name in rng.choice(names, size=4)]
+            chosen = optimize_voicings(song, main_matrix)
+            best = min(
+                sequence_cost(sequence, main_matrix)
+                for sequence in itertools.product(*(main_matrix.candidates(name) for name in song))
+            )
+            assert [main_matrix.names[i] for i in chosen] == song
+            assert sequence_cost(chosen, main_matrix) == pytest.approx(best)
+
+    def test_format_suggestions(self, small_matrix: VoicingMatrix):
+        """Test the suggestion output format."""
+        output = format_suggestions(["A Major", "H Major"], [0, None], small_matrix)
+        assert output.splitlines() == [
+            "Suggested voicing - A Major: A 0 D 2 G 2 B 2 E 0",
+            "Total voice-leading cost - 0",
+        ]
@@ -0,0 +1,238 @@
+"""Tests for the watcher module."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from ocr_tabber.chord_recognizer import load_chord_database
+from ocr_tabber.watcher import (
+    MANIFEST_NAME,
+    InotifyWatcher,
+    PollingWatcher,
+    ProcessedManifest,
+    file_digest,
+    process_image,
+    watch_directory,
+)
+
+
+@pytest.fixture
+def chord_db(data_dir: Path):
+    """Load the main chord database."""
+    return load_chord_database(data_dir / "mainDB.pkl")
+
+
+@pytest.fixture
+def fake_ocr(data_dir: Path):
+    """An OCR function that returns the sample ASCII tab and records its calls."""
+    tab_text = (data_dir / "ASCIItab.txt").read_text()
+    calls = []
+
+    def ocr(image_path: str) -> str:
+        calls.append(image_path)
+        return tab_text
+
+    ocr.calls = calls
+    return ocr
+
+
+class TestProcessedManifest:
+    """Tests for ProcessedManifest class."""
+
+    def test_persists_across_instances(self, temp_dir: Path):
+        """Test that recorded digests survive a reload."""
+        manifest = ProcessedManifest(temp_dir / MANIFEST_NAME)
+        manifest.record("page.png", "abc")
+
+        reloaded = ProcessedManifest(temp_dir / MANIFEST_NAME)
+        assert reloaded.is_processed("page.png", "abc")
+        assert not reloaded.is_processed("page.png", "def")
+
+    def test_corrupt_manifest(self, temp_dir: Path):
+        """Test that IOError is raised for unreadable manifests."""
+        (temp_dir / MANIFEST_NAME).write_text("{not json")
+        with pytest.raises(IOError, match="Failed to read manifest"):
+            ProcessedManifest(temp_dir / MANIFEST_NAME)
+
+
+class TestProcessImage:
+    """Tests for process_image function."""
+
+    def test_results_written_next_to_image(self, temp_dir: Path, chord_db, fake_ocr):
+        """Test that OCR text and recognized chords are written beside the input."""
+        img_path = temp_dir / "song.png"
+        img_path.write_bytes(b"image")
+
+        written = process_image(img_path, chord_db, fake_ocr)
+
+        assert written == [temp_dir / "song.tab.txt", temp_dir / "song.chords.txt"]
+        assert "Chord recognized - Eb Major" in (temp_dir / "song.chords.txt").read_text()
+
+    def test_unparseable_ocr_output(self, temp_dir: Path, chord_db):
+        """Test that only the OCR text is written when it isn't a tab."""
+        img_path = temp_dir / "photo.png"
+        img_path.write_bytes(b"image")
+
+        written = process_image(img_path, chord_db, lambda path: "no tab here")
+
+        assert written == [temp_dir / "photo.tab.txt"]
+
+
+class TestWatchDirectory:
+    """Tests for watch_directory function."""
+
+    def test_restart_skips_processed_images(self, temp_dir: Path, chord_db, fake_ocr):
+        """Test that unchanged images are skipped and changed ones reprocessed."""
+        (temp_dir / "a.png").write_bytes(b"first")
+        (temp_dir / "b.jpg").write_bytes(b"second")
+        (temp_dir / "notes.txt").write_text("not an image")
+
+        stats = watch_directory(temp_dir, chord_db, fake_ocr, once=True)
+        assert stats["processed"] == 2
+
+        (temp_dir / "b.jpg").write_bytes(b"second, rescanned")
+        stats = watch_directory(temp_dir, chord_db, fake_ocr, once=True)
+
+        assert stats == {"processed": 1, "skipped": 1}
+        assert len(fake_ocr.calls) == 3
+
+    def test_failures_counted(self, temp_dir: Path, chord_db):
+        """Test that OCR failures are counted and not recorded as processed."""
+        (temp_dir / "a.png").write_bytes(b"image")
+
+        def failing_ocr(image_path: str) -> str:
+            raise RuntimeError("OCR processing failed")
+
+        stats = watch_directory(temp_dir, chord_db, failing_ocr, once=True)
+        assert stats == {"failed": 1}
+        assert not (temp_dir / MANIFEST_NAME).exists()
+
+    def test_picks_up_new_images(self, temp_dir: Path, chord_db, fake_ocr):
+        """Test that images added while watching are processed."""
+        stop = threading.Event()
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(watch_directory(
+            temp_dir, chord_db, fake_ocr, poll_interval=0.05, use_inotify=False, stop_event=stop
+        )))
+        thread.start()
+        try:
+            (temp_dir / "new.png").write_bytes(b"image")
+            for _ in range(100):
+                if (temp_dir / "new.chords.txt").exists():
+                    break
+                threading.Event().wait(0.05)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert result == {"processed": 1}
+
+    def test_changed_while_processing(self, temp_dir: Path, chord_db, fake_ocr):
+        """Test that an image is never processed twice at once, and reprocessed after a change."""
+        img_path = temp_dir / "a.png"
+        img_path.write_bytes(b"first")
+        release = threading.Event()
+        running = []
+        overlaps = []
+
+        def slow_ocr(image_path: str) -> str:
+            running.append(image_path)
+            overlaps.append(len(running))
+            release.wait(5)
+            running.pop()
+            return fake_ocr(image_path)
+
+        stop = threading.Event()
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(watch_directory(
+            temp_dir, chord_db, slow_ocr, poll_interval=0.02, use_inotify=False, stop_event=stop
+        )))
+        thread.start()
+        try:
+            while not running:
+                threading.Event().wait(0.01)
+            img_path.write_bytes(b"second")
+            threading.Event().wait(0.2)  # Long enough for the poller to report the change
+            release.set()
+            manifest = ProcessedManifest(temp_dir / MANIFEST_NAME)
+            for _ in range(200):
+                if manifest.is_processed("a.png", file_digest(img_path)):
+                    break
+                threading.Event().wait(0.02)
+                manifest = ProcessedManifest(temp_dir / MANIFEST_NAME)
+        finally:
+            release.set()
+            stop.set()
+            thread.join()
+
+        assert len(fake_ocr.calls) == 2
+        assert max(overlaps) == 1
+        assert manifest.is_processed("a.png", file_digest(img_path))
+        assert result == {"processed": 2}
+
+    def test_stop_drops_queued_images(self, temp_dir: Path, chord_db, fake_ocr):
+        """Test that stopping finishes the running image but not the queued ones."""
+        for i in range(5):
+            (temp_dir / f"{i}.png").write_bytes(b"image %d" % i)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_ocr(image_path: str) -> str:
+            started.set()
+            release.wait(5)
+            return fake_ocr(image_path)
+
+        stop = threading.Event()
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(watch_directory(
+            temp_dir, chord_db, slow_ocr, workers=1, poll_interval=0.02, use_inotify=False, stop_event=stop
+        )))
+        thread.start()
+        try:
+            assert started.wait(5)
+            stop.set()
+            threading.Event().wait(0.1)
+        finally:
+            release.set()
+            thread.join()
+
+        assert result == {"processed": 1}
+
+    def test_unexpected_errors_reported(self, temp_dir: Path, chord_db, capsys):
+        """Test that errors outside the expected ones are counted and printed."""
+        (temp_dir / "a.png").write_bytes(b"image")
+
+        def broken_ocr(image_path: str) -> str:
+            raise KeyError("boom")
+
+        stats = watch_directory(temp_dir, chord_db, broken_ocr, once=True)
+
+        assert stats == {"failed": 1}
+        assert "Unexpected error processing" in capsys.readouterr().err
+
+
+class TestWatchers:
+    """Tests for the polling and inotify watchers."""
+
+    def test_polling_waits_for_stable_file(self, temp_dir: Path):
+        """Test that a file is reported once it stops changing, and only once."""
+        watcher = PollingWatcher(temp_dir)
+        img_path = temp_dir / "scan.png"
+        img_path.write_bytes(b"partial")
+
+        assert watcher.changes(0) == []
+        assert watcher.changes(0) == [img_path]
+        assert watcher.changes(0) == []
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+    def test_inotify_reports_written_images(self, temp_dir: Path):
+        """Test that closing a written image is reported and other files are ignored."""
+        watcher = InotifyWatcher(temp_dir)
+        try:
+            (temp_dir / "scan.png").write_bytes(b"image")
+            (temp_dir / "scan.tab.txt").write_text("result")
+            assert watcher.changes(1.0) == [temp_dir / "scan.png"]
+        finally:
+            watcher.close()